@@ -6,44 +6,150 @@ to validate, clean, categorize, and assign a confidence score.
 
 Only events with confidence >= 0.7 are marked as valid.
 
+In drain mode the whole backlog is processed in one run: pending events
+are packed into batches sized by estimated prompt/response tokens, several
+batches are in flight at once under a requests/tokens-per-minute limit,
+and each batch's results are written back as soon as it completes.
+
+Every event carries an AI state (pending, accepted, rejected, or error
+with a retry count). Only pending events and errored ones with retries
+left are considered, and of those only content without a cached verdict
+(see ai_verdicts.py) is sent to the model. Accepted/rejected events whose
+title, date, location or URL changed since their verdict become pending
+again. Obvious junk and obvious London tech events are settled by the
+local pre-classifier (see ai_prefilter.py) without a model call.
+
+Model responses are salvaged item by item: a truncated array or one
+malformed item no longer loses the whole batch. In drain mode events left
+without a valid answer are re-sent in the same run, in halves once a retry
+fails again, so a poison event ends up alone and is quarantined after
+QUARANTINE_AFTER failed solo attempts instead of taking its batch down with it.
+
 Run:
-    python ai_cleaner.py
+    python ai_cleaner.py                        # One batch of 20 events
+    python ai_cleaner.py --drain                # Validate every pending event
+    python ai_cleaner.py --drain --workers 8 --rpm 120 --tpm 200000
+    python ai_cleaner.py --drain --no-prefilter # Send every uncached event to the model
+    python ai_cleaner.py --drain --base-url http://127.0.0.1:8765/v1   # Local stub (ai_stub_server.py)
 """
 
+import argparse
 import os
 import json
+import re
 import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime, date
 from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 
 from dotenv import load_dotenv
 from openai import OpenAI
 
+from ai_prefilter import RULES_SOURCE, PreClassifier, load_preclassifier
+from ai_verdicts import (
+    ACCEPTED, ERROR, MAX_AI_RETRIES, PENDING, QUARANTINED, REJECTED, AiVerdictCache, content_hash,
+)
+from db_schema import apply_schema
+
 DB_PATH = Path(__file__).parent / "database.db"
 
 load_dotenv()  # load .env if present
 
+MODEL = os.getenv("AI_MODEL", "gpt-4o-mini")
+# OpenAI-compatible endpoint; None means the OpenAI API (see ai_stub_server.py for a local one)
+MODEL_BASE_URL = os.getenv("OPENAI_BASE_URL") or None
+MODEL_SOURCE = "model"
+# Bump when build_ai_prompt's instructions change: cached verdicts no longer apply
+PROMPT_VERSION = "1"
+
+# Token budgets per request (estimated, see estimate_tokens)
+MAX_PROMPT_TOKENS = 8000
+MAX_RESPONSE_TOKENS = 4000
+RESPONSE_TOKENS_PER_EVENT = 80
+CHARS_PER_TOKEN = 4
+
+# Pending events read from the database at a time in drain mode
+DRAIN_PAGE_SIZE = 500
+
+# Attempts within one drain run, sent alone, after which an event that
+# never gets a valid answer is quarantined
+QUARANTINE_AFTER = 3
+
+CODE_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$")
+
+# Rows the AI stage should look at: new/changed, or errored with retries left
+# (only failures of the event sent alone use up retries, see mark_ai_errors)
+AI_DUE_CONDITION = (
+    f"(ai_state IS NULL OR ai_state = '{PENDING}' "
+    f"OR (ai_state = '{ERROR}' AND ai_retries < {MAX_AI_RETRIES}))"
+)
+
+
+class MalformedResponse(RuntimeError):
+    """The model answered, but no result could be parsed from the response."""
+
+
+def event_hash(title, event_date, location, url) -> str:
+    """Verdict cache key of an event's content for the current model and prompt."""
+    return content_hash(title, event_date, location, url, MODEL, PROMPT_VERSION)
+
 
 def init_db():
     """Ensure DB and schema exist and return a connection."""
     conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    with open(Path(__file__).parent / "schema.sql", "r", encoding="utf-8") as f:
-        cur.executescript(f.read())
-    conn.commit()
+    apply_schema(conn)
+    conn.create_function("ai_content_hash", 4, event_hash, deterministic=True)
     return conn
 
 
+def sync_ai_states(conn) -> int:
+    """
+    Give rows validated before AI states existed (no ai_hash yet) their
+    state, and send accepted/rejected/errored rows whose content changed
+    back to pending.
+    
+    Returns the number of rows made pending again.
+    """
+    with conn:
+        conn.execute(
+            f"""
+            UPDATE events
+            SET ai_state = CASE WHEN is_valid = 1 THEN '{ACCEPTED}' ELSE '{REJECTED}' END,
+                ai_hash = ai_content_hash(title, date, location, source_url)
+            WHERE (ai_state IS NULL OR ai_state = '{PENDING}') AND ai_hash IS NULL
+              AND confidence_score IS NOT NULL
+            """
+        )
+        return conn.execute(
+            f"""
+            UPDATE events
+            SET ai_state = '{PENDING}', ai_retries = 0
+            WHERE ai_state IN ('{ACCEPTED}', '{REJECTED}', '{ERROR}', '{QUARANTINED}')
+              AND ai_hash IS NOT ai_content_hash(title, date, location, source_url)
+            """
+        ).rowcount
+
+
 def fetch_unprocessed_events(conn, limit: int = 20):
     """
-    Fetch events that are not yet validated by AI (is_valid = 0 and confidence_score is NULL).
+    Fetch events the AI stage should look at (see AI_DUE_CONDITION).
+
+    Events whose canonical URL belongs to an older event are duplicates and are not sent.
     """
     cur = conn.cursor()
     cur.execute(
-        """
+        f"""
         SELECT id, title, date, location, is_free, source_name, source_url, created_at
         FROM events
-        WHERE (confidence_score IS NULL OR is_valid = 0)
+        WHERE {AI_DUE_CONDITION}
+          AND NOT EXISTS (
+              SELECT 1 FROM events AS older
+              WHERE older.canonical_url = events.canonical_url AND older.id < events.id
+          )
         ORDER BY created_at DESC
         LIMIT ?
         """,
@@ -67,6 +173,93 @@ def fetch_unprocessed_events(conn, limit: int = 20):
     return events
 
 
+def fetch_pending_page(conn, before_id: Optional[int], limit: int = DRAIN_PAGE_SIZE) -> List[Dict]:
+    """
+    Fetch the next page of due events for drain mode, newest first.
+    
+    Paging on id (before_id) means every event is looked at most once per run,
+    so errored events are retried on later runs rather than in a loop.
+    """
+    rows = conn.execute(
+        f"""
+        SELECT id, title, date, location, is_free, source_name, source_url, created_at
+        FROM events
+        WHERE {AI_DUE_CONDITION}
+          AND (? IS NULL OR id < ?)
+          AND NOT EXISTS (
+              SELECT 1 FROM events AS older
+              WHERE older.canonical_url = events.canonical_url AND older.id < events.id
+          )
+        ORDER BY id DESC
+        LIMIT ?
+        """,
+        (before_id, before_id, limit),
+    ).fetchall()
+    columns = ["id", "title", "date", "location", "is_free", "source_name", "source_url", "created_at"]
+    events = [dict(zip(columns, row)) for row in rows]
+    for event in events:
+        event["is_free"] = bool(event["is_free"])
+    return events
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for English/JSON)."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def pack_batches(events: List[Dict], max_prompt_tokens: int = MAX_PROMPT_TOKENS,
+                 max_response_tokens: int = MAX_RESPONSE_TOKENS) -> List[List[Dict]]:
+    """
+    Split events into batches whose estimated prompt and response both fit
+    the per-request token budgets.
+    """
+    system, user = build_ai_prompt([])
+    overhead = estimate_tokens(system) + estimate_tokens(user)
+    max_events = max(1, max_response_tokens // RESPONSE_TOKENS_PER_EVENT)
+
+    batches = []
+    batch: List[Dict] = []
+    batch_tokens = overhead
+    for event in events:
+        tokens = estimate_tokens(json.dumps(event, ensure_ascii=False))
+        if batch and (batch_tokens + tokens > max_prompt_tokens or len(batch) >= max_events):
+            batches.append(batch)
+            batch, batch_tokens = [], overhead
+        batch.append(event)
+        batch_tokens += tokens
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+class ApiRateLimiter:
+    """Sliding one-minute window limiting requests and tokens per minute."""
+
+    def __init__(self, requests_per_minute: int = 60, tokens_per_minute: Optional[int] = None):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._sent = deque()  # (timestamp, tokens)
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: int):
+        """Block until a request using `tokens` tokens fits in the window."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._sent and now - self._sent[0][0] >= 60:
+                    self._sent.popleft()
+                used = sum(t for _, t in self._sent)
+                fits_requests = len(self._sent) < self.requests_per_minute
+                # A request larger than the whole TPM budget is let through on an empty window
+                fits_tokens = (not self.tokens_per_minute or not self._sent
+                               or used + tokens <= self.tokens_per_minute)
+                if fits_requests and fits_tokens:
+                    self._sent.append((now, tokens))
+                    return
+                wait_for = 60 - (now - self._sent[0][0])
+            time.sleep(max(wait_for, 0.05))
+
+
 def build_ai_prompt(events):
     """
     Build a concise prompt asking the AI to validate and categorize events.
@@ -100,45 +293,101 @@ def build_ai_prompt(events):
     return system, json.dumps(user, ensure_ascii=False)
 
 
-def call_openai(events):
-    """
-    Call the OpenAI API with the events and return parsed JSON results.
-    """
+def create_client() -> OpenAI:
+    """Client for the configured backend (MODEL_BASE_URL); a local backend needs no key."""
     api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
+    if not api_key and not MODEL_BASE_URL:
         raise RuntimeError("OPENAI_API_KEY is not set in environment (.env).")
+    return OpenAI(api_key=api_key or "local", base_url=MODEL_BASE_URL)
+
+
+def salvage_results(content: Optional[str]) -> List:
+    """
+    Parse the model's JSON array of results, keeping every complete item when
+    the array is truncated (max_tokens) or contains malformed items.
+    
+    Raises MalformedResponse when nothing can be recovered.
+    """
+    text = CODE_FENCE.sub("", (content or "").strip())
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        pass
+    else:
+        if isinstance(data, dict):
+            # {"results": [...]} or a single result object
+            data = next((value for value in data.values() if isinstance(value, list)), [data])
+        if isinstance(data, list):
+            return data
+        raise MalformedResponse("AI response is not a JSON array.")
+
+    start = text.find("[")
+    if start < 0:
+        raise MalformedResponse(f"Failed to parse AI response as JSON:\n{text[:200]}")
+    decoder = json.JSONDecoder()
+    items = []
+    position = start + 1
+    while True:
+        position = text.find("{", position)
+        if position < 0:
+            break
+        try:
+            item, position = decoder.raw_decode(text, position)
+        except json.JSONDecodeError:
+            position += 1  # Skip the broken item and resync on the next object
+            continue
+        items.append(item)
+    if not items:
+        raise MalformedResponse(f"Failed to parse AI response as JSON:\n{text[:200]}")
+    return items
+
+
+def valid_result(result) -> bool:
+    """
+    True if a result item has an id, a verdict, a usable confidence and,
+    for accepts, a cleaned title. Items cut short (e.g. by a truncated
+    response) fail and are retried instead of being stored.
+    """
+    if not isinstance(result, dict) or result.get("id") is None or "is_valid" not in result:
+        return False
+    if "confidence" not in result:
+        return False
+    if result["is_valid"] and not str(result.get("cleaned_title") or "").strip():
+        return False
+    try:
+        return 0.0 <= float(result["confidence"]) <= 1.0
+    except (TypeError, ValueError):
+        return False
+
 
-    client = OpenAI(api_key=api_key)
+def call_openai(events, client: Optional[OpenAI] = None, max_tokens: int = 1500):
+    """
+    Call the OpenAI API with the events and return the parsed JSON results
+    (every result that could be salvaged, see salvage_results).
+    """
+    client = client or create_client()
 
     system_content, user_content = build_ai_prompt(events)
 
     # Using a GPT-4-level chat model. Replace with another if needed.
     response = client.chat.completions.create(
-        model="gpt-4o-mini",
+        model=MODEL,
         messages=[
             {"role": "system", "content": system_content},
             {"role": "user", "content": user_content},
         ],
         temperature=0.2,
-        max_tokens=1500,
+        max_tokens=max_tokens,
     )
 
-    content = response.choices[0].message.content
-    try:
-        data = json.loads(content)
-    except json.JSONDecodeError as e:
-        raise RuntimeError(f"Failed to parse AI response as JSON: {e}\nRaw content:\n{content}")
-
-    if not isinstance(data, list):
-        raise RuntimeError("AI response is not a JSON array.")
+    return salvage_results(response.choices[0].message.content)
 
-    return data
 
-
-def update_events(conn, ai_results):
+def update_events(conn, ai_results, source: str = MODEL_SOURCE):
     """
     Update events in DB based on AI results.
     Only keep those with confidence >= 0.7 and is_valid == true.
+    `source` records who decided ("model" or the pre-classifier's "rules").
     """
     cur = conn.cursor()
     updated = 0
@@ -159,13 +408,17 @@ def update_events(conn, ai_results):
                 """
                 UPDATE events
                 SET is_valid = 0,
-                    confidence_score = ?
+                    confidence_score = ?,
+                    ai_state = ?,
+                    ai_retries = 0,
+                    ai_hash = ai_content_hash(title, date, location, source_url),
+                    ai_verdict_source = ?
                 WHERE id = ?
                 """,
-                (confidence, ev_id),
+                (confidence, REJECTED, source, ev_id),
             )
         else:
-            # Approve event
+            # Approve event; the hash covers the cleaned values written here
             cur.execute(
                 """
                 UPDATE events
@@ -173,32 +426,267 @@ def update_events(conn, ai_results):
                     confidence_score = ?,
                     title = ?,
                     category = ?,
-                    date = ?
+                    date = ?,
+                    ai_state = ?,
+                    ai_retries = 0,
+                    ai_hash = ai_content_hash(?, ?, location, source_url),
+                    ai_verdict_source = ?
                 WHERE id = ?
                 """,
-                (confidence, cleaned_title, category, norm_date, ev_id),
+                (confidence, cleaned_title, category, norm_date, ACCEPTED, cleaned_title, norm_date, source,
+                 ev_id),
             )
         updated += 1
 
     conn.commit()
-    print(f"Updated {updated} events using AI results.")
+    print(f"Updated {updated} events using {'AI' if source == MODEL_SOURCE else source} results.")
+    return updated
 
 
-def main():
+def mark_ai_errors(conn, event_ids, count_retry: bool = False) -> int:
+    """
+    Put events whose request failed (or that the model left out) in the error
+    state, so the next run sends them again.
+    
+    Only `count_retry` failures use up the event's retry budget: pass it
+    when the event was sent alone, so the failure is the event's own. After
+    MAX_AI_RETRIES of those it is quarantined. Failed requests (outages, a
+    bad key, exhausted 429 retries) never quarantine anything.
+    """
+    with conn:
+        conn.executemany(
+            f"""
+            UPDATE events
+            SET ai_state = CASE WHEN ? AND COALESCE(ai_retries, 0) + 1 >= {MAX_AI_RETRIES}
+                                THEN '{QUARANTINED}' ELSE '{ERROR}' END,
+                ai_retries = COALESCE(ai_retries, 0) + ?,
+                ai_hash = ai_content_hash(title, date, location, source_url)
+            WHERE id = ?
+            """,
+            [(int(count_retry), int(count_retry), event_id) for event_id in event_ids],
+        )
+    return len(event_ids)
+
+
+def quarantine_events(conn, event_ids) -> int:
+    """Stop sending events that kept breaking the model's responses (until their content changes)."""
+    with conn:
+        conn.executemany(
+            f"""
+            UPDATE events
+            SET ai_state = '{QUARANTINED}',
+                ai_retries = COALESCE(ai_retries, 0) + 1,
+                ai_hash = ai_content_hash(title, date, location, source_url)
+            WHERE id = ?
+            """,
+            [(event_id,) for event_id in event_ids],
+        )
+    return len(event_ids)
+
+
+def resolve_locally(conn, events: List[Dict], cache: AiVerdictCache,
+                    prefilter: Optional[PreClassifier] = None) -> List[Dict]:
+    """
+    Apply cached verdicts, then the pre-classifier's verdicts, to the events
+    they settle; return the events that still need the model.
+    """
+    cached_results = []
+    uncached = []
+    for event in events:
+        verdict = cache.get(event_hash(event["title"], event["date"], event["location"], event["source_url"]))
+        if verdict is None:
+            uncached.append(event)
+        else:
+            cached_results.append(dict(verdict, id=event["id"]))
+    if cached_results:
+        update_events(conn, cached_results)
+    if prefilter is None:
+        return uncached
+
+    rule_results, ambiguous = prefilter.split(uncached)
+    if rule_results:
+        update_events(conn, rule_results, source=RULES_SOURCE)
+    return ambiguous
+
+
+def apply_batch_results(conn, batch: List[Dict], ai_results,
+                        cache: AiVerdictCache) -> Tuple[int, List[Dict]]:
+    """
+    Write and cache the valid results for one batch.
+    
+    Returns:
+        (events updated, events of the batch left without a valid result)
+    """
+    by_id = {event["id"]: event for event in batch}
+    results = {}
+    for result in ai_results:
+        if valid_result(result) and result["id"] in by_id:
+            results.setdefault(result["id"], result)
+    for event_id, result in results.items():
+        event = by_id[event_id]
+        key = event_hash(event["title"], event["date"], event["location"], event["source_url"])
+        cache.record(key, result, MODEL, PROMPT_VERSION)
+    updated = update_events(conn, list(results.values())) if results else 0
+    return updated, [event for event_id, event in by_id.items() if event_id not in results]
+
+
+def drain_backlog(conn, cache: AiVerdictCache, workers: int = 4, requests_per_minute: int = 60,
+                  tokens_per_minute: Optional[int] = None,
+                  prefilter: Optional[PreClassifier] = None) -> Dict[str, int]:
+    """
+    Validate every due event: cached and rule verdicts first, then token-sized batches
+    with `workers` requests in flight under the rate limit, results written
+    back as each batch completes.
+    
+    Events a response left without a valid result are re-sent: once as one
+    batch, then split in half on every further failure. An event that still
+    fails when sent alone QUARANTINE_AFTER times is quarantined. Failed API calls
+    (after the client's own retries) put the batch in the error state for
+    the next run instead.
+    
+    Database access stays on the calling thread; workers only call the API.
+    """
+    client = None
+    limiter = ApiRateLimiter(requests_per_minute, tokens_per_minute)
+    stats = {"batches": 0, "events_sent": 0, "events_cached": 0, "events_ruled": 0,
+             "events_updated": 0, "failed_batches": 0, "retried_batches": 0, "quarantined": 0,
+             "db_seconds": 0.0, "request_latencies": []}
+    solo_attempts: Dict[int, int] = {}
+    started = time.perf_counter()
+
+    def run_batch(batch):
+        system, user = build_ai_prompt(batch)
+        max_tokens = min(MAX_RESPONSE_TOKENS, RESPONSE_TOKENS_PER_EVENT * len(batch) + 200)
+        limiter.acquire(estimate_tokens(system) + estimate_tokens(user) + max_tokens)
+        sent = time.perf_counter()
+        try:
+            return call_openai(batch, client=client, max_tokens=max_tokens)
+        finally:
+            stats["request_latencies"].append(time.perf_counter() - sent)
+
+    def submit(batch, retry=0):
+        pending[pool.submit(run_batch, batch)] = (batch, retry)
+        stats["batches"] += 1
+        stats["events_sent"] += len(batch)
+
+    def finish(future, batch, retry):
+        try:
+            results = future.result()
+        except MalformedResponse as e:
+            print(f"  ⚠️  Unreadable response for {len(batch)} events: {str(e)[:80]}")
+            results = []
+        except Exception as e:
+            stats["failed_batches"] += 1
+            print(f"  ❌ Batch of {len(batch)} events failed: {str(e)[:120]}")
+            db_started = time.perf_counter()
+            mark_ai_errors(conn, [event["id"] for event in batch])
+            stats["db_seconds"] += time.perf_counter() - db_started
+            return
+
+        db_started = time.perf_counter()
+        updated, missing = apply_batch_results(conn, batch, results, cache)
+        stats["events_updated"] += updated
+        # Only failures of an event sent alone count towards quarantine
+        poison = []
+        if missing and len(batch) == 1:
+            event_id = batch[0]["id"]
+            solo_attempts[event_id] = solo_attempts.get(event_id, 0) + 1
+            if solo_attempts[event_id] >= QUARANTINE_AFTER:
+                poison = batch
+        if poison:
+            stats["quarantined"] += quarantine_events(conn, [event["id"] for event in poison])
+            print(f"  🚫 Quarantined event {poison[0]['id']} after {QUARANTINE_AFTER} failed solo attempts")
+        stats["db_seconds"] += time.perf_counter() - db_started
+        if not missing or poison:
+            return
+
+        # Retry only the events without an answer; halve once a retry failed too
+        stats["retried_batches"] += 1
+        if retry == 0 or len(missing) == 1:
+            submit(missing, retry + 1)
+        else:
+            middle = len(missing) // 2
+            submit(missing[:middle], retry + 1)
+            submit(missing[middle:], retry + 1)
+
+    print(f"🤖 Draining AI backlog ({workers} concurrent requests, {requests_per_minute} req/min)...")
+    before_id = None
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = {}
+        while True:
+            page = fetch_pending_page(conn, before_id)
+            if not page:
+                break
+            before_id = page[-1]["id"]
+            hits = cache.hits
+            db_started = time.perf_counter()
+            uncached = resolve_locally(conn, page, cache, prefilter)
+            stats["db_seconds"] += time.perf_counter() - db_started
+            stats["events_cached"] += cache.hits - hits
+            stats["events_ruled"] += len(page) - len(uncached) - (cache.hits - hits)
+            if uncached and client is None:
+                client = create_client()
+            for batch in pack_batches(uncached):
+                submit(batch)
+
+                # Keep at most 2 batches per worker queued; write back finished ones
+                while len(pending) >= workers * 2:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        finish(future, *pending.pop(future))
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                finish(future, *pending.pop(future))
+
+    elapsed = time.perf_counter() - started
+    print(f"✓ {stats['events_sent']} events in {stats['batches']} batches "
+          f"({stats['failed_batches']} failed, {stats['retried_batches']} retries, "
+          f"{stats['quarantined']} quarantined), {stats['events_cached']} from cache, "
+          f"{stats['events_ruled']} by rules, "
+          f"{stats['events_updated']} updated in {elapsed:.1f}s ({stats['db_seconds']:.2f}s in DB writes)")
+    return stats
+
+
+def main(drain: bool = False, workers: int = 4, requests_per_minute: int = 60,
+         tokens_per_minute: Optional[int] = None, prefilter: bool = True):
     """Load unprocessed events, validate with AI, update database."""
     try:
         conn = init_db()
+        cache = AiVerdictCache(DB_PATH)
+        classifier = load_preclassifier() if prefilter else None
         try:
+            changed = sync_ai_states(conn)
+            if changed:
+                print(f"{changed} validated events changed since their verdict and will be re-checked.")
+
+            if drain:
+                drain_backlog(conn, cache, workers, requests_per_minute, tokens_per_minute, classifier)
+                return
+
             events = fetch_unprocessed_events(conn, limit=20)
             if not events:
                 print("No unprocessed events found.")
                 return
+            events = resolve_locally(conn, events, cache, classifier)
+            if not events:
+                print("All events settled from cache or local rules.")
+                return
 
             print(f"Sending {len(events)} events to AI for validation...")
-            ai_results = call_openai(events)
-            update_events(conn, ai_results)
+            try:
+                ai_results = call_openai(events)
+            except Exception:
+                mark_ai_errors(conn, [event["id"] for event in events])
+                raise
+            _, missing = apply_batch_results(conn, events, ai_results, cache)
+            if missing:
+                print(f"{len(missing)} events got no valid result and will be retried next run.")
+                mark_ai_errors(conn, [event["id"] for event in missing], count_retry=len(events) == 1)
             print("AI validation completed successfully!")
         finally:
+            cache.flush()
             conn.close()
     
     except RuntimeError as e:
@@ -208,4 +696,16 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Validate events with AI")
+    parser.add_argument("--drain", action="store_true", help="Validate every pending event")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent API requests in drain mode")
+    parser.add_argument("--rpm", type=int, default=60, help="Max API requests per minute (default: 60)")
+    parser.add_argument("--tpm", type=int, default=None, help="Max estimated tokens per minute")
+    parser.add_argument("--no-prefilter", action="store_true", help="Do not settle obvious events with local rules")
+    parser.add_argument("--base-url", default=None, help="OpenAI-compatible endpoint (default: OpenAI API)")
+    args = parser.parse_args()
+    if args.base_url:
+        MODEL_BASE_URL = args.base_url
+    main(drain=args.drain, workers=max(1, args.workers),
+         requests_per_minute=max(1, args.rpm), tokens_per_minute=args.tpm,
+         prefilter=not args.no_prefilter)
@@ -0,0 +1,216 @@
+"""
+ai_prefilter.py
+
+Local, offline pre-classifier that settles obvious AI validation verdicts
+before any event is sent to the model.
+
+- Auto-reject: navigation/boilerplate link text picked up by the scrapers
+  ("View all events", "Sign in", ...), titles too short to be an event,
+  restricted-audience events and events whose date has passed.
+- Auto-accept: a parsed upcoming date, a London location and an
+  unambiguous tech keyword in the title.
+- Everything else is ambiguous and goes to the model.
+
+The junk title patterns and the tech/London keywords live in
+filter_rules.json next to the content filter rules.
+
+Because the rules can drift from what the model would decide, the report
+mode replays them over events the model already judged and prints how
+often the rules would have decided and how often they agree.
+
+Run:
+    python ai_prefilter.py            # Agreement with past model verdicts
+"""
+
+import json
+import re
+import sqlite3
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ai_verdicts import ACCEPTED, REJECTED
+from content_filters import FILTER_RULES_FILE, FilterRules, load_filter_rules
+from db_schema import apply_schema
+
+DB_PATH = Path(__file__).parent / "database.db"
+
+# Verdict source recorded in events.ai_verdict_source
+RULES_SOURCE = "rules"
+
+ACCEPT_CONFIDENCE = 0.8
+REJECT_CONFIDENCE = 0.1
+MIN_TITLE_LENGTH = 5
+# Dates further ahead than this are more likely misparsed than real
+MAX_DAYS_AHEAD = 365
+
+WHITESPACE = re.compile(r"\s+")
+# Arrows, bullets and punctuation around link text ("View all events →")
+TITLE_TRIM = " \t\r\n.:;!?-–—→›»>|•*#()[]"
+
+CATEGORY_KEYWORDS = [
+    ("Hackathon", re.compile(r"\bhack(?:athon|day|night)s?\b")),
+    ("Workshop", re.compile(r"\b(?:workshops?|bootcamps?|hands-on|tutorials?|masterclass)\b")),
+    ("Conference", re.compile(r"\b(?:conferences?|summit|expo|con \d{4})\b")),
+    ("Meetup", re.compile(r"\b(?:meetups?|meet-ups?|networking|social|drinks|talks?)\b")),
+]
+
+
+def normalize_title(title: Optional[str]) -> str:
+    return WHITESPACE.sub(" ", (title or "").lower()).strip(TITLE_TRIM)
+
+
+def keyword_pattern(keywords: Iterable[str]) -> Optional[re.Pattern]:
+    """Whole-word alternation of lowercase keywords (longest first)."""
+    words = sorted({k.strip().lower() for k in keywords if k.strip()}, key=len, reverse=True)
+    if not words:
+        return None
+    return re.compile(r"(?<![\w.])(?:" + "|".join(map(re.escape, words)) + r")(?![\w])")
+
+
+class PreClassifier:
+    """Deterministic accept/reject rules for obvious events."""
+
+    def __init__(self, rules: FilterRules, junk_titles: List[str], tech_keywords: List[str],
+                 london_keywords: List[str]):
+        self.rules = rules
+        self.junk_title = re.compile("|".join(f"(?:{p})" for p in junk_titles)) if junk_titles else None
+        self.tech = keyword_pattern(tech_keywords)
+        self.london = keyword_pattern(london_keywords)
+        self.accepted = 0
+        self.rejected = 0
+        self.forwarded = 0
+
+    def classify(self, event: Dict, today: Optional[date] = None) -> Optional[Dict]:
+        """
+        Return a verdict dict (same fields as a model result) for an obvious
+        event, or None when the model has to decide.
+        """
+        today = today or date.today()
+        title = normalize_title(event.get("title"))
+        if len(title) < MIN_TITLE_LENGTH:
+            return self.reject(event, "title too short")
+        if self.junk_title and self.junk_title.fullmatch(title):
+            return self.reject(event, "navigation link")
+        if self.rules.is_restricted(event.get("title"), event.get("location")):
+            return self.reject(event, "restricted audience")
+
+        day = self.rules.event_date(event.get("date")) or self.rules.event_date(event.get("title"))
+        if day is not None and day < today:
+            return self.reject(event, "past event")
+
+        location = (event.get("location") or "").lower()
+        if (day is not None and day <= today + timedelta(days=MAX_DAYS_AHEAD)
+                and self.london and self.london.search(location)
+                and self.tech and self.tech.search(title)):
+            return {
+                "id": event.get("id"),
+                "is_valid": True,
+                "confidence": ACCEPT_CONFIDENCE,
+                "cleaned_title": WHITESPACE.sub(" ", event["title"]).strip(),
+                "category": next((name for name, pattern in CATEGORY_KEYWORDS if pattern.search(title)), "Other"),
+                "date": day.isoformat(),
+                "reason": "upcoming London tech event",
+            }
+        return None
+
+    def reject(self, event: Dict, reason: str) -> Dict:
+        return {
+            "id": event.get("id"),
+            "is_valid": False,
+            "confidence": REJECT_CONFIDENCE,
+            "cleaned_title": event.get("title"),
+            "category": "Other",
+            "date": event.get("date"),
+            "reason": reason,
+        }
+
+    def split(self, events: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+        """Return (verdicts for obvious events, ambiguous events for the model)."""
+        verdicts = []
+        ambiguous = []
+        for event in events:
+            verdict = self.classify(event)
+            if verdict is None:
+                ambiguous.append(event)
+            elif verdict["is_valid"]:
+                verdicts.append(verdict)
+                self.accepted += 1
+            else:
+                verdicts.append(verdict)
+                self.rejected += 1
+        self.forwarded += len(ambiguous)
+        return verdicts, ambiguous
+
+
+def load_preclassifier(path: Path = FILTER_RULES_FILE) -> PreClassifier:
+    """Load the pre-classifier rules (and the content filter rules it reuses)."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return PreClassifier(
+        load_filter_rules(path),
+        data.get("junk_titles", []),
+        data.get("tech_keywords", []),
+        data.get("london_keywords", []),
+    )
+
+
+def agreement_report(conn, classifier: PreClassifier) -> Dict[str, int]:
+    """
+    Replay the rules over events the model (or its cached verdicts) judged.
+
+    Each event is classified as of the day it was stored, so events that
+    have since passed are not counted as disagreements.
+    """
+    rows = conn.execute(
+        f"""
+        SELECT id, title, date, location, ai_state, created_at
+        FROM events
+        WHERE ai_state IN ('{ACCEPTED}', '{REJECTED}')
+          AND ai_verdict_source IS NOT '{RULES_SOURCE}'
+        """
+    ).fetchall()
+    counts = {"judged": len(rows), "decided": 0, "agree": 0,
+              "accept_agree": 0, "accept_disagree": 0, "reject_agree": 0, "reject_disagree": 0}
+    for event_id, title, event_date, location, state, created_at in rows:
+        stored = classifier.rules.event_date(created_at) or date.today()
+        verdict = classifier.classify(
+            {"id": event_id, "title": title, "date": event_date, "location": location}, today=stored
+        )
+        if verdict is None:
+            continue
+        counts["decided"] += 1
+        agrees = verdict["is_valid"] == (state == ACCEPTED)
+        counts["agree"] += agrees
+        kind = "accept" if verdict["is_valid"] else "reject"
+        counts[f"{kind}_{'agree' if agrees else 'disagree'}"] += 1
+    return counts
+
+
+def print_report(counts: Dict[str, int]):
+    judged, decided = counts["judged"], counts["decided"]
+    print("\n" + "=" * 60)
+    print("📊 PRE-CLASSIFIER vs MODEL VERDICTS")
+    print("=" * 60)
+    print(f"Model verdicts replayed: {judged}")
+    print(f"Decided by rules:        {decided} ({decided / judged:.0%})" if judged else "Decided by rules:        0")
+    if decided:
+        print(f"Agreement:               {counts['agree'] / decided:.1%}")
+    for kind in ("accept", "reject"):
+        total = counts[f"{kind}_agree"] + counts[f"{kind}_disagree"]
+        if total:
+            print(f"  Rule {kind}s:            {total} ({counts[f'{kind}_agree'] / total:.1%} agree)")
+    print("=" * 60 + "\n")
+
+
+def main():
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        apply_schema(conn)
+        print_report(agreement_report(conn, load_preclassifier()))
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+"""
+ai_stub_server.py
+
+Local stand-in for the OpenAI chat completions API, so the AI stage can be
+run, measured and tuned without a key or network.
+
+POST /v1/chat/completions answers ai_cleaner's prompt with one verdict per
+event in the request. Verdicts are replayed from the ai_verdicts table of
+a recorded database when the event's content is found there, and are
+synthetic (deterministic per event id) otherwise. Latency, server errors
+and 429 rate limiting are configurable:
+
+- latency: fixed base per request plus per event, with random jitter,
+- error rate: fraction of requests answered with 500,
+- throttle rate: fraction of requests answered with 429 + Retry-After,
+- rpm: requests per minute above which every request gets a 429,
+- malformed rate: fraction of responses with one corrupted item,
+- truncate rate: fraction of responses cut off mid-array (as by max_tokens),
+- poison marker: a batch containing an event whose title has the marker
+  gets an unparseable response.
+
+Run:
+    python ai_stub_server.py                          # http://127.0.0.1:8765/v1
+    python ai_stub_server.py --latency 0.8 --error-rate 0.02 --rpm 500
+    python ai_stub_server.py --replay database.db     # Serve recorded verdicts
+    python ai_stub_server.py --malformed-rate 0.1 --truncate-rate 0.1 --poison "[POISON]"
+    python ai_cleaner.py --drain --base-url http://127.0.0.1:8765/v1
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+import zlib
+from collections import deque
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from ai_cleaner import CHARS_PER_TOKEN, event_hash
+from ai_verdicts import AiVerdictCache
+
+CATEGORIES = ["Hackathon", "Workshop", "Meetup", "Conference", "Other"]
+
+
+class StubModelServer:
+    """Threaded HTTP server speaking the chat completions API with canned verdicts."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8765, latency: float = 0.2,
+                 latency_per_event: float = 0.01, jitter: float = 0.5, error_rate: float = 0.0,
+                 throttle_rate: float = 0.0, requests_per_minute: Optional[int] = None,
+                 retry_after: float = 1.0, replay_db: Optional[Path] = None, seed: int = 0,
+                 malformed_rate: float = 0.0, truncate_rate: float = 0.0, poison_marker: Optional[str] = None):
+        self.latency = latency
+        self.latency_per_event = latency_per_event
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.requests_per_minute = requests_per_minute
+        self.retry_after = retry_after
+        self.malformed_rate = malformed_rate
+        self.truncate_rate = truncate_rate
+        self.poison_marker = poison_marker
+        self.recorded = AiVerdictCache(replay_db) if replay_db else None
+        self.random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._window = deque()
+        self.counters: Dict[str, int] = {
+            "requests": 0, "ok": 0, "errors": 0, "throttled": 0, "events": 0, "replayed": 0,
+            "malformed": 0, "truncated": 0, "poisoned": 0,
+        }
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                status, payload, headers = stub.handle(self.path, body)
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> str:
+        """Serve in a background thread; returns the base URL for ai_cleaner."""
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self.base_url
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def count(self, **counts: int):
+        with self._lock:
+            for name, value in counts.items():
+                self.counters[name] += value
+
+    def throttled(self) -> bool:
+        """True if this request is over the rpm limit or randomly throttled."""
+        with self._lock:
+            if self.throttle_rate and self.random.random() < self.throttle_rate:
+                return True
+            if not self.requests_per_minute:
+                return False
+            now = time.monotonic()
+            while self._window and now - self._window[0] >= 60:
+                self._window.popleft()
+            if len(self._window) >= self.requests_per_minute:
+                return True
+            self._window.append(now)
+            return False
+
+    def handle(self, path: str, body: bytes):
+        """Return (status, JSON payload, extra headers) for one request."""
+        self.count(requests=1)
+        if not path.rstrip("/").endswith("/chat/completions"):
+            return 404, {"error": {"message": f"Unknown path {path}"}}, {}
+        if self.throttled():
+            self.count(throttled=1)
+            return 429, {"error": {"message": "Rate limit reached", "type": "rate_limit_exceeded"}}, {
+                "Retry-After": f"{self.retry_after:g}"}
+        try:
+            request = json.loads(body)
+            events = json.loads(request["messages"][-1]["content"])["events"]
+        except (ValueError, KeyError, IndexError, TypeError) as e:
+            return 400, {"error": {"message": f"Bad request: {e}"}}, {}
+
+        with self._lock:
+            delay = (self.latency + self.latency_per_event * len(events)) * (
+                1 + self.random.uniform(-self.jitter, self.jitter))
+            fail = self.error_rate and self.random.random() < self.error_rate
+        time.sleep(max(delay, 0.0))
+        if fail:
+            self.count(errors=1)
+            return 500, {"error": {"message": "The server had an error", "type": "server_error"}}, {}
+
+        content = self.content([self.verdict(event) for event in events], events)
+        self.count(ok=1, events=len(events))
+        prompt_tokens = len(body) // CHARS_PER_TOKEN
+        completion_tokens = len(content) // CHARS_PER_TOKEN
+        return 200, {
+            "id": f"chatcmpl-stub-{self.counters['requests']}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "stub"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }, {}
+
+    def content(self, verdicts: List[Dict], events: List[Dict]) -> str:
+        """Serialize the verdicts, injecting the configured response faults."""
+        if self.poison_marker and any(self.poison_marker in str(e.get("title")) for e in events):
+            self.count(poisoned=1)
+            return "I'm sorry, I can't help with that request."
+        items = [json.dumps(verdict, ensure_ascii=False) for verdict in verdicts]
+        with self._lock:
+            malformed = items and self.random.random() < self.malformed_rate
+            truncated = items and self.random.random() < self.truncate_rate
+            broken = self.random.randrange(len(items)) if items else 0
+        if malformed:
+            self.count(malformed=1)
+            items[broken] = items[broken][: len(items[broken]) // 2] + "}"
+        content = "[" + ", ".join(items) + "]"
+        if truncated:
+            self.count(truncated=1)
+            content = content[: len(content) * 3 // 4]
+        return content
+
+    def verdict(self, event: Dict) -> Dict:
+        """Recorded verdict for this content if there is one, else a synthetic one."""
+        if self.recorded:
+            recorded = self.recorded.get(event_hash(event.get("title"), event.get("date"),
+                                                    event.get("location"), event.get("source_url")))
+            if recorded:
+                self.count(replayed=1)
+                return dict(recorded, id=event.get("id"))
+
+        # Stable per id, so repeated runs over the same data agree
+        roll = zlib.crc32(str(event.get("id")).encode()) % 100
+        is_valid = roll >= 30
+        return {
+            "id": event.get("id"),
+            "is_valid": is_valid,
+            "cleaned_title": " ".join(str(event.get("title") or "").split()),
+            "category": CATEGORIES[roll % len(CATEGORIES)],
+            "confidence": 0.9 if is_valid else 0.3,
+            "date": (event.get("date") or (date.today() + timedelta(days=roll % 30 + 1)).isoformat())[:10],
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stub of the OpenAI chat completions API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.2, help="Base seconds per request (default: 0.2)")
+    parser.add_argument("--latency-per-event", type=float, default=0.01, help="Extra seconds per event (default: 0.01)")
+    parser.add_argument("--jitter", type=float, default=0.5, help="Random +/- fraction of the latency (default: 0.5)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 500")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--rpm", type=int, default=None, help="Answer 429 above this many requests per minute")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--replay", type=Path, default=None, help="Database whose ai_verdicts are replayed")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="Fraction of responses with a broken item")
+    parser.add_argument("--truncate-rate", type=float, default=0.0, help="Fraction of responses cut off mid-array")
+    parser.add_argument("--poison", default=None, help="Title marker that makes a whole response unparseable")
+    args = parser.parse_args()
+
+    server = StubModelServer(
+        args.host, args.port, latency=args.latency, latency_per_event=args.latency_per_event,
+        jitter=args.jitter, error_rate=args.error_rate, throttle_rate=args.throttle_rate,
+        requests_per_minute=args.rpm, retry_after=args.retry_after, replay_db=args.replay,
+        malformed_rate=args.malformed_rate, truncate_rate=args.truncate_rate, poison_marker=args.poison,
+    )
+    print(f"🤖 Stub model API on {server.base_url} (Ctrl+C to stop)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+        print(f"\n📊 {server.counters}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+ai_verdicts.py
+
+Content-addressed cache of AI validation verdicts.
+
+Each verdict is stored under a hash of the normalized event content
+(title, date, location, canonical URL) plus the model and prompt version
+that produced it. An event that is deleted and scraped again, or the same
+listing found under another id, gets its verdict from the cache instead of
+another API call; changing the model or PROMPT_VERSION invalidates every
+entry at once because the key changes.
+
+Failed requests are never cached, so errors are retried.
+
+Usage:
+    cache = AiVerdictCache(DB_PATH)
+    key = content_hash(title, date, location, url, MODEL, PROMPT_VERSION)
+    verdict = cache.get(key)        # dict or None
+    cache.record(key, verdict, MODEL, PROMPT_VERSION)
+    cache.flush()
+"""
+
+import hashlib
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from db_schema import apply_schema
+from url_canonical import canonical_url
+
+# Per-event AI processing states (events.ai_state)
+PENDING = "pending"
+ACCEPTED = "accepted"
+REJECTED = "rejected"
+ERROR = "error"
+# Failed MAX_AI_RETRIES times (or kept breaking responses): no longer sent
+QUARANTINED = "quarantined"
+
+# Events that failed this many runs when sent alone are quarantined; failed
+# requests (outages, auth errors, rate limits) do not count
+MAX_AI_RETRIES = 3
+
+VERDICT_FIELDS = ("is_valid", "confidence", "cleaned_title", "category", "date")
+
+WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(value: Optional[str]) -> str:
+    return WHITESPACE.sub(" ", str(value or "")).strip().lower()
+
+
+def content_hash(title: Optional[str], event_date: Optional[str], location: Optional[str],
+                 url: Optional[str], model: str, prompt_version: str) -> str:
+    """Stable key for the AI verdict on this content with this model and prompt."""
+    parts = [
+        normalize_text(title),
+        normalize_text(event_date),
+        normalize_text(location),
+        canonical_url(url) or normalize_text(url),
+        model,
+        prompt_version,
+    ]
+    return hashlib.sha1("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+class AiVerdictCache:
+    """Verdict cache backed by the ai_verdicts table."""
+
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict] = {}
+        self._dirty: List[str] = []
+        self.hits = 0
+        self.misses = 0
+        self.load()
+
+    def load(self):
+        """Ensure the schema exists and read all cached verdicts into memory."""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            apply_schema(conn)
+            rows = conn.execute(
+                "SELECT content_hash, is_valid, confidence, cleaned_title, category, date, model, prompt_version "
+                "FROM ai_verdicts"
+            ).fetchall()
+        finally:
+            conn.close()
+        for key, is_valid, confidence, cleaned_title, category, event_date, model, prompt_version in rows:
+            self._entries[key] = {
+                "is_valid": bool(is_valid),
+                "confidence": confidence,
+                "cleaned_title": cleaned_title,
+                "category": category,
+                "date": event_date,
+                "model": model,
+                "prompt_version": prompt_version,
+            }
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return a copy of the cached verdict for `key`, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return {field: entry[field] for field in VERDICT_FIELDS}
+
+    def record(self, key: str, verdict: Dict, model: str, prompt_version: str):
+        """Store the verdict the model returned for the content behind `key`."""
+        with self._lock:
+            self._entries[key] = {
+                "is_valid": bool(verdict.get("is_valid")),
+                "confidence": float(verdict.get("confidence", 0.0)),
+                "cleaned_title": verdict.get("cleaned_title"),
+                "category": verdict.get("category"),
+                "date": verdict.get("date"),
+                "model": model,
+                "prompt_version": prompt_version,
+            }
+            self._dirty.append(key)
+
+    def flush(self):
+        """Write all verdicts recorded since the last flush in one transaction."""
+        now = datetime.now().isoformat(timespec="seconds")
+        with self._lock:
+            rows = [
+                (
+                    key,
+                    int(self._entries[key]["is_valid"]),
+                    self._entries[key]["confidence"],
+                    self._entries[key]["cleaned_title"],
+                    self._entries[key]["category"],
+                    self._entries[key]["date"],
+                    self._entries[key]["model"],
+                    self._entries[key]["prompt_version"],
+                    now,
+                )
+                for key in dict.fromkeys(self._dirty)
+            ]
+            self._dirty = []
+        if not rows:
+            return
+        conn = sqlite3.connect(self.db_path)
+        try:
+            with conn:
+                conn.executemany(
+                    """
+                    INSERT OR REPLACE INTO ai_verdicts (
+                        content_hash, is_valid, confidence, cleaned_title, category, date,
+                        model, prompt_version, created_at
+                    )
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    rows,
+                )
+        finally:
+            conn.close()
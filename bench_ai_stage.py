@@ -0,0 +1,167 @@
+"""
+bench_ai_stage.py
+
+Offline throughput benchmark for the AI validation stage.
+
+Fills a temporary database with synthetic events, starts the local stub
+model API (ai_stub_server.py) and drains the backlog through the real
+ai_cleaner code path: verdict cache, optional pre-classifier, token-sized
+batches, concurrent requests, rate limiter and per-batch DB writes.
+Reports events/sec, requests (with 429s and errors), p50/p99 request
+latency and the time spent writing results, so batching and concurrency
+changes can be compared without a key or network.
+
+Run:
+    python bench_ai_stage.py                           # 2000 events, 4 workers
+    python bench_ai_stage.py --events 5000 --workers 8
+    python bench_ai_stage.py --latency 0.5 --error-rate 0.05 --stub-rpm 300
+    python bench_ai_stage.py --prefilter               # Include the local rules
+    python bench_ai_stage.py --malformed-rate 0.2 --truncate-rate 0.2 --poison 5
+"""
+
+import argparse
+import contextlib
+import io
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, List
+
+import ai_cleaner
+from ai_prefilter import load_preclassifier
+from ai_stub_server import StubModelServer
+from ai_verdicts import AiVerdictCache
+
+TOPICS = ["Python", "Community", "Design", "Founders", "Data", "Product", "Women in", "Cloud", "Growth", "Open"]
+KINDS = ["Meetup", "Night", "Workshop", "Breakfast", "Summit", "Social", "Talks", "Hack Day", "Forum", "Lab"]
+LOCATIONS = ["London", "Shoreditch, London", "Online", "Canary Wharf", "Kings Cross", "TBC"]
+POISON_MARKER = "[POISON]"
+
+
+def create_events(count: int, poison: int = 0, seed: int = 0):
+    """
+    Insert `count` synthetic pending events into ai_cleaner's database,
+    `poison` of them breaking any response they are in.
+    """
+    rng = random.Random(seed)
+    today = date.today()
+    poisoned = set(rng.sample(range(count), min(poison, count)))
+    rows = []
+    for i in range(count):
+        title = f"{rng.choice(TOPICS)} {rng.choice(KINDS)} #{i}"
+        if i in poisoned:
+            title += f" {POISON_MARKER}"
+        day = today + timedelta(days=rng.randint(-10, 90))
+        url = f"https://events.example.com/e/{i}"
+        rows.append((f"bench_{i}", title, day.isoformat(), rng.choice(LOCATIONS), rng.randint(0, 1),
+                     "bench", url, url))
+    conn = ai_cleaner.init_db()
+    with conn:
+        conn.executemany(
+            """
+            INSERT INTO events (source_id, title, date, location, is_free, source_name, source_url, canonical_url)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            rows,
+        )
+    conn.close()
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def run_benchmark(args) -> Dict:
+    """Drain a fresh synthetic backlog through the stub and return the metrics."""
+    server = StubModelServer(
+        port=0, latency=args.latency, latency_per_event=args.latency_per_event, jitter=args.jitter,
+        error_rate=args.error_rate, throttle_rate=args.throttle_rate,
+        requests_per_minute=args.stub_rpm, retry_after=args.retry_after,
+        malformed_rate=args.malformed_rate, truncate_rate=args.truncate_rate,
+        poison_marker=POISON_MARKER if args.poison else None,
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        ai_cleaner.DB_PATH = Path(tmp) / "bench.db"
+        ai_cleaner.MODEL_BASE_URL = server.start()
+        try:
+            create_events(args.events, args.poison)
+            conn = ai_cleaner.init_db()
+            cache = AiVerdictCache(ai_cleaner.DB_PATH)
+            classifier = load_preclassifier() if args.prefilter else None
+
+            with contextlib.redirect_stdout(io.StringIO()):  # silence per-batch progress
+                started = time.perf_counter()
+                stats = ai_cleaner.drain_backlog(conn, cache, args.workers, args.rpm, args.tpm, classifier)
+                elapsed = time.perf_counter() - started
+            states = dict(conn.execute("SELECT ai_state, COUNT(*) FROM events GROUP BY ai_state").fetchall())
+            conn.close()
+        finally:
+            server.stop()
+
+    latencies = stats.pop("request_latencies")
+    return {
+        "elapsed": elapsed,
+        "events_per_sec": args.events / elapsed if elapsed else 0.0,
+        "p50": percentile(latencies, 0.50),
+        "p99": percentile(latencies, 0.99),
+        "server": dict(server.counters),
+        "states": states,
+        **stats,
+    }
+
+
+def report(args, results: Dict):
+    server = results["server"]
+    print("\n" + "=" * 70)
+    print("📊 AI STAGE BENCHMARK")
+    print("=" * 70)
+    print(f"Events:             {args.events} ({results['events_sent']} sent to the model, "
+          f"{results['events_ruled']} by rules)")
+    print(f"Wall time:          {results['elapsed']:.2f}s")
+    print(f"Throughput:         {results['events_per_sec']:.1f} events/sec")
+    print(f"Batches:            {results['batches']} ({results['failed_batches']} failed, "
+          f"{results['retried_batches']} retries)")
+    print(f"HTTP requests:      {server['requests']} ({server['throttled']} x 429, {server['errors']} x 500)")
+    print(f"Broken responses:   {server['malformed']} malformed item, {server['truncated']} truncated, "
+          f"{server['poisoned']} unparseable")
+    print(f"Quarantined:        {results['quarantined']}")
+    print(f"Request latency:    p50 {results['p50'] * 1000:.0f} ms, p99 {results['p99'] * 1000:.0f} ms")
+    print(f"DB write time:      {results['db_seconds']:.3f}s")
+    print(f"Final states:       " + ", ".join(f"{state}: {n}" for state, n in sorted(results["states"].items())))
+    print("=" * 70 + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline AI stage benchmark")
+    parser.add_argument("--events", type=int, default=2000, help="Synthetic events (default: 2000)")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent requests (default: 4)")
+    parser.add_argument("--rpm", type=int, default=100000, help="Client requests/minute limit (default: 100000)")
+    parser.add_argument("--tpm", type=int, default=None, help="Client tokens/minute limit")
+    parser.add_argument("--prefilter", action="store_true", help="Settle obvious events with the local rules")
+    parser.add_argument("--latency", type=float, default=0.2, help="Stub base latency per request (default: 0.2)")
+    parser.add_argument("--latency-per-event", type=float, default=0.005,
+                        help="Stub latency per event (default: 0.005)")
+    parser.add_argument("--jitter", type=float, default=0.5, help="Stub latency jitter fraction (default: 0.5)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of stub requests failing with 500")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of stub requests getting 429")
+    parser.add_argument("--stub-rpm", type=int, default=None, help="Stub answers 429 above this rate")
+    parser.add_argument("--retry-after", type=float, default=0.5, help="Retry-After sent with 429s (default: 0.5)")
+    parser.add_argument("--malformed-rate", type=float, default=0.0,
+                        help="Fraction of stub responses with one broken item")
+    parser.add_argument("--truncate-rate", type=float, default=0.0,
+                        help="Fraction of stub responses cut off mid-array")
+    parser.add_argument("--poison", type=int, default=0, help="Events that make any response they are in unparseable")
+    args = parser.parse_args()
+    args.workers = max(1, args.workers)
+
+    print(f"⏱️  Draining {args.events} synthetic events with {args.workers} workers through the stub...")
+    report(args, run_benchmark(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""
+bench_parsers.py
+
+Offline benchmark for the scraper's parsers, replaying recorded listing pages.
+
+Record the current listing page of every source in sources.json once
+(needs network), then replay the fixtures through EventScraper.scrape_source
+as often as needed without touching the live sites. Reports pages/sec,
+events/sec and peak memory per parser and fails when throughput drops
+more than the allowed threshold below the saved baseline.
+
+Run:
+    python bench_parsers.py --record              # Save fixtures from live sites
+    python bench_parsers.py                       # Replay fixtures, compare to baseline
+    python bench_parsers.py --save-baseline       # Replay and store results as baseline
+    python bench_parsers.py --backend lxml        # Compare another BeautifulSoup backend
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict
+
+import scraper_advanced
+from scraper_advanced import EVENT_SOURCES, EventScraper
+
+FIXTURES_DIR = Path(__file__).parent / "benchmarks" / "fixtures"
+BASELINE_FILE = Path(__file__).parent / "benchmarks" / "baseline.json"
+
+
+class FixtureResponse:
+    """Minimal stand-in for requests.Response serving a recorded page."""
+
+    def __init__(self, url: str, text: str):
+        self.url = url
+        self.text = text
+        self.status_code = 200
+        self.headers: Dict[str, str] = {}
+
+    def raise_for_status(self):
+        pass
+
+
+class FixtureSession:
+    """Replays recorded pages instead of doing HTTP requests."""
+
+    def __init__(self, pages: Dict[str, str]):
+        self.pages = pages
+
+    def get(self, url, **kwargs):
+        return FixtureResponse(url, self.pages[url])
+
+
+class NoDelay:
+    """Rate limiter that never waits (fixtures are local)."""
+
+    def wait(self, url, min_interval=None):
+        pass
+
+
+class NoBreaker:
+    """Circuit breaker that always allows (fixtures never fail)."""
+
+    def allow(self, url):
+        return True
+
+    def record_response(self, url, status_code):
+        pass
+
+    def record_failure(self, url):
+        pass
+
+    def flush(self):
+        pass
+
+
+def fixture_path(name: str) -> Path:
+    return FIXTURES_DIR / f"{name}.html"
+
+
+def record_fixtures():
+    """Fetch every source once and store its page as a fixture."""
+    FIXTURES_DIR.mkdir(parents=True, exist_ok=True)
+    scraper = EventScraper(use_cache=False)
+    recorded = 0
+    for source in EVENT_SOURCES:
+        print(f"📥 Recording {source.name}...")
+        html = scraper.safe_fetch(source.url, timeout=source.timeout)
+        if html:
+            fixture_path(source.name).write_text(html, encoding="utf-8")
+            recorded += 1
+    print(f"\n✓ Recorded {recorded} of {len(EVENT_SOURCES)} sources into {FIXTURES_DIR}")
+
+
+def run_benchmark(iterations: int) -> Dict[str, Dict]:
+    """Replay all fixtures `iterations` times and return metrics per parser."""
+    sources = [s for s in EVENT_SOURCES if fixture_path(s.name).exists()]
+    if not sources:
+        print(f"No fixtures found in {FIXTURES_DIR}; run with --record first.")
+        sys.exit(1)
+
+    pages = {s.url: fixture_path(s.name).read_text(encoding="utf-8") for s in sources}
+    scraper = EventScraper(use_cache=False, skip_unchanged=False)
+    scraper.session = FixtureSession(pages)
+    scraper.rate_limiter = NoDelay()
+    scraper.breaker = NoBreaker()
+
+    totals = defaultdict(lambda: {"pages": 0, "events": 0, "seconds": 0.0, "peak_kb": 0.0})
+    for source in sources:
+        with contextlib.redirect_stdout(io.StringIO()):  # silence per-page progress
+            started = time.perf_counter()
+            events = 0
+            for _ in range(iterations):
+                events += len(scraper.scrape_source(source))
+            elapsed = time.perf_counter() - started
+
+            # Separate traced pass: tracemalloc would distort the timings
+            tracemalloc.start()
+            scraper.scrape_source(source)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+        stats = totals[source.parser]
+        stats["pages"] += iterations
+        stats["events"] += events
+        stats["seconds"] += elapsed
+        stats["peak_kb"] = max(stats["peak_kb"], peak / 1024)
+
+    results = {}
+    for parser, stats in totals.items():
+        seconds = stats["seconds"] or 1e-9
+        results[parser] = {
+            "pages_per_sec": stats["pages"] / seconds,
+            "events_per_sec": stats["events"] / seconds,
+            "peak_kb": stats["peak_kb"],
+        }
+    return results
+
+
+def report(results: Dict[str, Dict], baseline: Dict[str, Dict], threshold: float) -> bool:
+    """Print the results table; return False if any parser regressed."""
+    print("\n" + "=" * 78)
+    print(f"{'PARSER':<14}{'PAGES/S':>12}{'EVENTS/S':>12}{'PEAK KB':>12}{'BASELINE P/S':>14}{'CHANGE':>12}")
+    print("=" * 78)
+    ok = True
+    for parser, metrics in sorted(results.items()):
+        line = (f"{parser:<14}{metrics['pages_per_sec']:>12.1f}"
+                f"{metrics['events_per_sec']:>12.1f}{metrics['peak_kb']:>12.0f}")
+        base = baseline.get(parser)
+        if base:
+            change = metrics["pages_per_sec"] / base["pages_per_sec"] - 1
+            line += f"{base['pages_per_sec']:>14.1f}{change:>+11.0%}"
+            if change < -threshold:
+                line += "  ❌ REGRESSION"
+                ok = False
+        print(line)
+    print("=" * 78 + "\n")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline parser benchmark")
+    parser.add_argument("--record", action="store_true", help="Record fixtures from the live sources")
+    parser.add_argument("--iterations", type=int, default=20, help="Replays per fixture (default: 20)")
+    parser.add_argument("--backend", default=scraper_advanced.HTML_PARSER,
+                        help="BeautifulSoup tree builder to benchmark (default: html.parser)")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Allowed pages/sec drop vs baseline before failing (default: 0.25)")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the new baseline")
+    args = parser.parse_args()
+
+    if args.record:
+        record_fixtures()
+        return
+
+    scraper_advanced.HTML_PARSER = args.backend
+    print(f"⏱️  Replaying fixtures x{args.iterations} with backend '{args.backend}'...")
+    results = run_benchmark(args.iterations)
+
+    baseline = {}
+    if BASELINE_FILE.exists():
+        with open(BASELINE_FILE, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    ok = report(results, baseline, args.threshold)
+
+    if args.save_baseline:
+        with open(BASELINE_FILE, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"✓ Baseline saved to {BASELINE_FILE}")
+    elif not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
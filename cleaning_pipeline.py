@@ -0,0 +1,222 @@
+"""
+cleaning_pipeline.py
+
+Fused single-pass cleaning stage over the events table.
+
+Replaces the four separate cleaning passes (duplicate removal, relative-URL
+removal, link validation and URL enhancement), which each loaded the whole
+table and checked the same URLs again. Rows are streamed once through a
+cursor in batches; every row goes through dedupe (on title/location/date
+and on the canonical URL, see url_canonical.py), relative-URL removal,
+the university-only filter (classified for the whole batch at once by the
+compiled rule engine), URL cleanup, the URL check and source_id backfill.
+URL checks are scheduled per host on the link validator's thread pool
+with a bounded window of rows read ahead, and all mutations are committed
+in one transaction at the end. Only rows that are new, changed or stale
+are URL-checked unless a full sweep is requested.
+
+Run:
+    python cleaning_pipeline.py
+    python cleaning_pipeline.py --full   # Re-check every URL
+"""
+
+import hashlib
+import sqlite3
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from db_schema import apply_schema
+from enhance_events import EventEnhancer
+from host_health import HostUnavailable
+from http_transport import shared_transport
+from link_validator import LinkValidator, link_check_due, link_stale_before, mark_links_checked
+from url_canonical import LISTING_KEY_CONDITION, backfill_canonical_urls, canonical_url
+
+DB_PATH = Path(__file__).parent / "database.db"
+
+# Rows fetched and classified by the rule engine at a time
+BATCH_SIZE = 500
+
+
+class CleaningPipeline:
+    """Streams the events table once and applies every cleaning rule per row."""
+
+    def __init__(self, concurrency: int = 8, per_host: int = 2):
+        self.validator = LinkValidator(concurrency=concurrency, per_host=per_host)
+        self.enhancer = EventEnhancer(use_url_cache=False)
+        self.to_delete: Dict[str, List[int]] = {
+            "duplicate": [],
+            "duplicate_url": [],
+            "relative_url": [],
+            "no_url": [],
+            "university_only": [],
+            "broken_link": [],
+        }
+        self.url_updates: List[Tuple[str, int]] = []
+        self.source_id_updates: List[Tuple[str, int]] = []
+        self.checked_ids: List[int] = []
+        self.rows_read = 0
+        self.rows_not_due = 0
+        self.rows_host_down = 0
+
+    @staticmethod
+    def dedupe_key(title: Optional[str], location: Optional[str], date: Optional[str]) -> bytes:
+        """Digest of the (title, location, date) identity two duplicate events share."""
+        key = f"{(title or '').strip().lower()}\x1f{(location or '').strip().lower()}\x1f{date}"
+        return hashlib.blake2b(key.encode("utf-8"), digest_size=12).digest()
+
+    def classify(self, row, seen: set, restricted: bool) -> Optional[str]:
+        """
+        Apply the local (no network) rules; return a delete reason or None.
+
+        `restricted` is the rule engine's batch verdict for the row.
+        """
+        event_id, title, location, date, url, source_name, source_id = row[:7]
+        key = self.dedupe_key(title, location, date)
+        if key in seen:
+            return "duplicate"
+        seen.add(key)
+
+        canonical = row[9]  # str, so it never collides with the bytes digests
+        if canonical:
+            if canonical in seen:
+                return "duplicate_url"
+            seen.add(canonical)
+
+        if not url:
+            return "no_url"
+        if url.startswith("/"):
+            return "relative_url"
+        if restricted:
+            return "university_only"
+        return None
+
+    def finish_row(self, row, cleaned_url: str, is_valid: bool, final_url: Optional[str]):
+        """Record the mutations for a row whose URL has been checked."""
+        event_id, title, location, date, url, source_name, source_id = row[:7]
+        if not is_valid:
+            self.to_delete["broken_link"].append(event_id)
+            return
+        self.checked_ids.append(event_id)
+        new_url = final_url or cleaned_url
+        if new_url != url:
+            self.url_updates.append((new_url, canonical_url(new_url), event_id))
+        if not source_id:
+            self.source_id_updates.append((f"{source_name or 'event'}_{uuid.uuid4().hex[:8]}", event_id))
+
+    def collect(self, future, row, cleaned_url: str):
+        """Finish a row from its URL check; rows on an unavailable host are left as-is."""
+        try:
+            is_valid, final_url = future.result()
+        except HostUnavailable:
+            self.rows_host_down += 1
+            return
+        self.finish_row(row, cleaned_url, is_valid, final_url)
+
+    def run(self, full: bool = False, check_links: bool = True):
+        """
+        Run the fused cleaning stage.
+
+        Local rules apply to every row; URL checks only to rows that are
+        new, changed or stale, or to all rows when `full` is set. With
+        `check_links=False` no URL is checked (the budgeted link-check
+        scheduler takes care of them).
+        """
+        conn = sqlite3.connect(DB_PATH)
+        apply_schema(conn)
+        backfill_canonical_urls(conn)
+
+        print("\n" + "=" * 70)
+        print("🧹 SINGLE-PASS CLEANING STAGE")
+        print("=" * 70 + "\n")
+
+        started = time.perf_counter()
+        transport_mark = shared_transport().snapshot()
+        seen: set = set()
+        stale_before = link_stale_before()
+
+        cursor = conn.execute(
+            """
+            SELECT id, title, location, date, source_url, source_name, source_id,
+                   link_checked_at, link_checked_url, canonical_url
+            FROM events
+            ORDER BY id
+            """
+        )
+
+        def due_rows():
+            """Apply the local rules batch by batch; yield (row, cleaned_url) to URL-check."""
+            while True:
+                batch = cursor.fetchmany(BATCH_SIZE)
+                if not batch:
+                    return
+                restricted = self.validator.rules.classify_batch((row[1], row[2]) for row in batch)
+                for row, is_restricted in zip(batch, restricted):
+                    self.rows_read += 1
+                    reason = self.classify(row, seen, is_restricted)
+                    if reason:
+                        self.to_delete[reason].append(row[0])
+                        continue
+                    if not check_links or (not full and not link_check_due(row[7], row[8], row[4], stale_before)):
+                        self.rows_not_due += 1
+                        continue
+                    yield row, self.enhancer.extract_clean_eventbrite_url(row[4])
+
+        # At most one batch of rows waits in the validator's per-host queues
+        for (row, cleaned_url), future in self.validator.check_urls(due_rows(), lambda item: item[1], BATCH_SIZE):
+            self.collect(future, row, cleaned_url)
+
+        if self.validator.url_cache:
+            self.validator.url_cache.flush()
+        self.validator.breaker.flush()
+
+        # All mutations in one transaction
+        deleted = [event_id for ids in self.to_delete.values() for event_id in ids]
+        with conn:
+            if self.url_updates:
+                conn.executemany(
+                    f"""
+                    UPDATE events
+                    SET source_url = ?,
+                        canonical_url = CASE WHEN {LISTING_KEY_CONDITION} THEN canonical_url ELSE ? END
+                    WHERE id = ?
+                    """,
+                    self.url_updates,
+                )
+            if self.source_id_updates:
+                conn.executemany("UPDATE events SET source_id = ? WHERE id = ?", self.source_id_updates)
+            mark_links_checked(conn.cursor(), self.checked_ids)
+            if deleted:
+                conn.executemany("DELETE FROM events WHERE id = ?", [(event_id,) for event_id in deleted])
+        conn.close()
+        elapsed = time.perf_counter() - started
+
+        print("=" * 70)
+        print("📊 CLEANING SUMMARY")
+        print("=" * 70)
+        print(f"Rows read (1 pass):    {self.rows_read}")
+        for reason, ids in self.to_delete.items():
+            print(f"{'Removed (' + reason + '):':<28}{len(ids)}")
+        print(f"URLs checked:          {len(self.checked_ids) + len(self.to_delete['broken_link'])}")
+        print(f"{'Not checked now:' if not check_links else 'Recently checked:':<23}{self.rows_not_due}")
+        print(f"Skipped (host down):   {self.rows_host_down}")
+        print(f"URLs updated:          {len(self.url_updates)}")
+        print(f"source_id backfilled:  {len(self.source_id_updates)}")
+        print(f"Remaining:             {self.rows_read - len(deleted)}")
+        if self.validator.url_cache:
+            print(f"URL cache hits/misses: {self.validator.url_cache.hits} / {self.validator.url_cache.misses}")
+        print(f"Elapsed:               {elapsed:.1f}s")
+        shared_transport().report(since=transport_mark)
+        print("=" * 70 + "\n")
+        return True
+
+
+def main():
+    import sys
+    CleaningPipeline().run(full="--full" in sys.argv)
+
+
+if __name__ == "__main__":
+    main()
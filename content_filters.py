@@ -0,0 +1,115 @@
+"""
+content_filters.py
+
+Compiled rule engine for the local (no network) content filters.
+
+The university/restricted-audience keywords and the title date patterns
+are declared in filter_rules.json, so they can be changed without touching
+code. The keyword list is compiled into a single alternation regex that is
+matched against lowercased text (much cheaper than re.IGNORECASE), and the
+date patterns are precompiled once.
+
+classify_batch() checks a whole batch of rows with one regex scan over the
+concatenated texts, so filtering costs one pass per batch instead of one
+substring scan per keyword per row, and runs before any URL is checked.
+
+Usage:
+    rules = load_filter_rules()
+    rules.is_restricted(title, location)
+    rules.extract_date(title)
+    rules.event_date("Sat, 12 Apr 2025 18:00")   # -> date(2025, 4, 12)
+    flags = rules.classify_batch([(title, location), ...])   # [bool, ...]
+"""
+
+import json
+import re
+from bisect import bisect_right
+from datetime import date, datetime
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+FILTER_RULES_FILE = Path(__file__).parent / "filter_rules.json"
+
+# Joins the rows of a batch; no keyword can match across it
+ROW_SEPARATOR = "\x00"
+
+# strptime formats for the dates matched by the date patterns (after
+# ordinal suffixes and commas are removed and month names shortened)
+DATE_FORMATS = ("%Y-%m-%d", "%d/%m/%Y", "%d %b %Y", "%b %d %Y")
+ORDINAL_SUFFIX = re.compile(r"(?<=\d)(?:st|nd|rd|th)\b", re.IGNORECASE)
+MONTH_NAME = re.compile(r"[A-Za-z]{3,}")
+
+
+class FilterRules:
+    """Compiled restricted-audience keywords and date patterns."""
+
+    def __init__(self, restricted_keywords: List[str], date_patterns: List[str]):
+        keywords = sorted({k.strip().lower() for k in restricted_keywords if k.strip()}, key=len, reverse=True)
+        self.restricted_keywords = keywords
+        self.restricted = re.compile("|".join(map(re.escape, keywords))) if keywords else None
+        # Patterns keep their priority order: the first pattern that matches wins
+        self.date_patterns = [re.compile(pattern, re.IGNORECASE) for pattern in date_patterns]
+
+    def is_restricted(self, title: str, location: str) -> bool:
+        """True if the event is restricted to students, staff or members."""
+        if not self.restricted:
+            return False
+        return self.restricted.search(f"{title or ''} {location or ''}".lower()) is not None
+
+    def extract_date(self, title: str) -> Optional[str]:
+        """Return the first date found in `title` by the highest-priority pattern."""
+        for pattern in self.date_patterns:
+            match = pattern.search(title or "")
+            if match:
+                return match.group(0)
+        return None
+
+    def event_date(self, text: Optional[str]) -> Optional[date]:
+        """Parse the calendar date of an event from its stored date text (or title)."""
+        if not text:
+            return None
+        try:
+            return datetime.fromisoformat(text.strip()[:10]).date()
+        except ValueError:
+            pass
+        found = self.extract_date(text)
+        if not found:
+            return None
+        found = ORDINAL_SUFFIX.sub("", found).replace(",", " ")
+        found = " ".join(MONTH_NAME.sub(lambda m: m.group(0)[:3], found).split())
+        for fmt in DATE_FORMATS:
+            try:
+                return datetime.strptime(found, fmt).date()
+            except ValueError:
+                continue
+        return None
+
+    def classify_batch(self, rows: Iterable[Tuple[Optional[str], Optional[str]]]) -> List[bool]:
+        """
+        Return is_restricted() for each (title, location) row with a single
+        regex scan over the whole batch.
+        """
+        texts = [
+            f"{title or ''} {location or ''}".lower().replace(ROW_SEPARATOR, " ")
+            for title, location in rows
+        ]
+        flags = [False] * len(texts)
+        if not self.restricted or not texts:
+            return flags
+
+        starts = []
+        offset = 0
+        for text in texts:
+            starts.append(offset)
+            offset += len(text) + len(ROW_SEPARATOR)
+
+        for match in self.restricted.finditer(ROW_SEPARATOR.join(texts)):
+            flags[bisect_right(starts, match.start()) - 1] = True
+        return flags
+
+
+def load_filter_rules(path: Path = FILTER_RULES_FILE) -> FilterRules:
+    """Load and compile the filter rules."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return FilterRules(data.get("restricted_keywords", []), data.get("date_patterns", []))
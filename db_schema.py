@@ -0,0 +1,49 @@
+"""
+db_schema.py
+
+Applies schema.sql and upgrades databases created by older versions.
+
+schema.sql only uses CREATE ... IF NOT EXISTS, which cannot add columns to
+an existing table. Columns introduced after a table was first released are
+listed in ADDED_COLUMNS and added with ALTER TABLE when missing; indexes
+on those columns live in ADDED_INDEXES because they can only be created
+once the column exists.
+"""
+
+import sqlite3
+from pathlib import Path
+
+SCHEMA_PATH = Path(__file__).parent / "schema.sql"
+
+# (table, column, definition)
+ADDED_COLUMNS = [
+    ("events", "link_checked_at", "TEXT"),
+    ("events", "link_checked_url", "TEXT"),
+    ("events", "canonical_url", "TEXT"),
+    ("events", "ai_state", "TEXT DEFAULT 'pending'"),
+    ("events", "ai_retries", "INTEGER DEFAULT 0"),
+    ("events", "ai_hash", "TEXT"),
+    ("events", "ai_verdict_source", "TEXT"),
+]
+
+ADDED_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_events_link_checked_at ON events(link_checked_at)",
+    "CREATE INDEX IF NOT EXISTS idx_events_canonical_url ON events(canonical_url)",
+    "CREATE INDEX IF NOT EXISTS idx_events_ai_state ON events(ai_state)",
+]
+
+
+def apply_schema(conn: sqlite3.Connection):
+    """Create missing tables, add missing columns and indexes, and commit."""
+    cur = conn.cursor()
+    with open(SCHEMA_PATH, "r", encoding="utf-8") as f:
+        cur.executescript(f.read())
+
+    for table, column, definition in ADDED_COLUMNS:
+        existing = {row[1] for row in cur.execute(f"PRAGMA table_info({table})")}
+        if column not in existing:
+            cur.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+    for statement in ADDED_INDEXES:
+        cur.execute(statement)
+    conn.commit()
@@ -4,14 +4,21 @@ enhance_events.py
 Enhance existing events with better URLs, dates, and validation.
 
 Features:
-- Re-validates all existing event URLs
+- Re-validates new, changed or stale event URLs (all of them with --full)
 - Removes broken links
 - Cleans up malformed data
 - Generates source_id if missing
 - Ensures data quality
+- Reuses recent check results from the shared url_checks cache
+
+Pure transformations (Eventbrite URL cleanup, source_id backfill) run as
+set-based SQL through Python functions registered on the connection; only
+the link checks go row by row.
 
 Run:
     python enhance_events.py
+    python enhance_events.py --full      # Re-validate every event
+    python enhance_events.py --verbose   # Log every event and list the table afterwards
 """
 
 import sqlite3
@@ -21,21 +28,72 @@ import uuid
 from pathlib import Path
 from typing import Tuple, Optional
 
+from db_schema import apply_schema
+from host_health import HostUnavailable, shared_breaker
+from http_transport import USER_AGENTS, shared_transport
+from link_validator import LINK_DUE_CONDITION, link_stale_before, mark_links_checked
+from url_canonical import LISTING_KEY_CONDITION, canonical_url, remove_canonical_duplicates
+from url_health import UrlHealthCache
+
 DB_PATH = Path(__file__).parent / "database.db"
 
-USER_AGENTS = [
-    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36",
-    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36",
-]
+
+def clean_eventbrite_url(url: Optional[str]) -> Optional[str]:
+    """Strip the query string (affiliate/tracking parameters) from EventBrite URLs"""
+    if url and 'eventbrite' in url and '?' in url:
+        return url.split('?')[0]
+    return url
+
+
+def new_source_id(source_name: Optional[str]) -> str:
+    """Generate a source_id for an event stored without one"""
+    return f"{source_name or 'event'}_{uuid.uuid4().hex[:8]}"
+
+
+def register_sql_functions(conn: sqlite3.Connection):
+    """Make the pure transformations callable from SQL on this connection"""
+    conn.create_function("clean_eventbrite_url", 1, clean_eventbrite_url, deterministic=True)
+    conn.create_function("canonical_url", 1, canonical_url, deterministic=True)
+    conn.create_function("new_source_id", 1, new_source_id)
+
+
+def apply_local_enhancements(conn: sqlite3.Connection) -> Tuple[int, int]:
+    """
+    Run the non-network enhancements over the whole table in one transaction.
+    
+    Returns:
+        (urls_cleaned, source_ids_added)
+    """
+    register_sql_functions(conn)
+    with conn:
+        urls_cleaned = conn.execute(
+            f"""
+            UPDATE events
+            SET source_url = clean_eventbrite_url(source_url),
+                canonical_url = CASE WHEN {LISTING_KEY_CONDITION} THEN canonical_url
+                                     ELSE canonical_url(clean_eventbrite_url(source_url)) END
+            WHERE instr(source_url, 'eventbrite') > 0 AND instr(source_url, '?') > 0
+            """
+        ).rowcount
+        source_ids_added = conn.execute(
+            "UPDATE events SET source_id = new_source_id(source_name) WHERE source_id IS NULL OR source_id = ''"
+        ).rowcount
+    return urls_cleaned, source_ids_added
 
 
 class EventEnhancer:
     """Enhance and validate existing events"""
     
-    def __init__(self):
-        self.session = requests.Session()
+    def __init__(self, use_url_cache: bool = True, verbose: bool = False):
+        self.session = shared_transport()
+        self.url_cache = UrlHealthCache(DB_PATH) if use_url_cache else None
+        self.breaker = shared_breaker()
+        self.verbose = verbose
+        self.last_check_cached = False
         self.updated = 0
+        self.source_ids_added = 0
         self.removed = 0
+        self.host_down = 0
         
     def get_headers(self):
         """Get random headers"""
@@ -46,120 +104,155 @@ class EventEnhancer:
         }
     
     def validate_url(self, url: str) -> Tuple[bool, Optional[str]]:
-        """Validate URL and return final URL after redirects"""
+        """Validate URL and return final URL after redirects (cached; raises HostUnavailable)"""
         if not url or not isinstance(url, str):
             return False, None
         
         if not url.startswith('http'):
             return False, None
         
+        self.last_check_cached = False
+        if self.url_cache:
+            cached = self.url_cache.get(url)
+            if cached is not None:
+                self.last_check_cached = True
+                return cached
+        
+        if not self.breaker.allow(url):
+            raise HostUnavailable(url)
+        result = self.request_url(url)
+        if self.url_cache:
+            self.url_cache.record(url, *result)
+        return result
+    
+    def request_url(self, url: str) -> Tuple[bool, Optional[str]]:
+        """
+        Check the URL over the network (HEAD, then GET if HEAD is refused).
+        
+        Raises HostUnavailable when a timeout or connection error trips the
+        host's circuit, so the event is kept rather than removed.
+        """
         try:
             # Try HEAD first
             response = self.session.head(url, headers=self.get_headers(), timeout=5, allow_redirects=True)
             
             if response.status_code == 404:
+                self.breaker.record_success(url)
                 return False, None
             if response.status_code >= 400:
-                try:
-                    response = self.session.get(url, headers=self.get_headers(), timeout=5, allow_redirects=True)
-                    if response.status_code >= 400:
-                        return False, None
-                except:
-                    return False, None
+                response = self.session.get(url, headers=self.get_headers(), timeout=5, allow_redirects=True)
             
+            self.breaker.record_response(url, response.status_code)
+            if response.status_code >= 400:
+                return False, None
             return True, response.url
+        except (requests.Timeout, requests.ConnectionError):
+            self.breaker.record_failure(url)
+            if self.breaker.state(url) != "closed":
+                raise HostUnavailable(url)  # This failure tripped the circuit
+            return False, None
         except Exception as e:
             return False, None
     
     def extract_clean_eventbrite_url(self, url: str) -> Optional[str]:
         """Clean up EventBrite URLs"""
-        if 'eventbrite' in url:
-            # EventBrite URLs sometimes have extra parameters
-            if '?' in url:
-                url = url.split('?')[0]
-            return url
-        return url
+        return clean_eventbrite_url(url)
     
-    def enhance_database(self):
-        """Enhance all events in database"""
+    def enhance_database(self, full: bool = False):
+        """
+        Enhance the database: set-based cleanup of every event, then link
+        checks for new, changed or stale events (all events if `full`).
+        """
         conn = sqlite3.connect(DB_PATH)
+        apply_schema(conn)
         cur = conn.cursor()
+        transport_mark = shared_transport().snapshot()
         
         print("\n" + "="*70)
         print("🔧 ENHANCING EVENTS DATABASE")
         print("="*70 + "\n")
         
-        # Get all events
-        rows = cur.execute(
-            "SELECT id, title, source_url, source_name FROM events"
-        ).fetchall()
+        # Same event under another URL variant: drop it before any HTTP work
+        duplicates = remove_canonical_duplicates(conn)
+        if duplicates:
+            print(f"🧬 Removed {duplicates} events duplicating an earlier event's URL\n")
         
-        print(f"📊 Processing {len(rows)} events...\n")
+        # Pure transformations for the whole table in bulk
+        self.updated, self.source_ids_added = apply_local_enhancements(conn)
+        print(f"🧽 Cleaned {self.updated} URLs, added {self.source_ids_added} source_ids\n")
+        
+        # Get the events that need processing
+        if full:
+            rows = cur.execute(
+                "SELECT id, title, source_url FROM events"
+            ).fetchall()
+        else:
+            rows = cur.execute(
+                f"SELECT id, title, source_url FROM events WHERE {LINK_DUE_CONDITION}",
+                (link_stale_before(),),
+            ).fetchall()
+        
+        print(f"📊 Processing {len(rows)} events"
+              f"{'' if full else ' (new, changed or stale)'}...\n")
         
         to_delete = []
-        updates = []
+        checked = []
         
-        for event_id, title, url, source_name in rows:
-            print(f"🔍 Event ID {event_id}: {title[:50]}...")
-            
-            # Clean URL
-            cleaned_url = self.extract_clean_eventbrite_url(url)
+        for event_id, title, url in rows:
+            if self.verbose:
+                print(f"🔍 Event ID {event_id}: {(title or '')[:50]}...")
             
-            # Validate URL
-            is_valid, final_url = self.validate_url(cleaned_url)
+            # Validate URL (already cleaned above)
+            try:
+                is_valid, final_url = self.validate_url(url)
+            except HostUnavailable:
+                print(f"   🔌 Host circuit open - skipping until a later run")
+                self.host_down += 1
+                continue
             
             if not is_valid:
-                print(f"   ❌ Link broken - MARKING FOR REMOVAL")
+                print(f"   ❌ Link broken - MARKING FOR REMOVAL: {(title or '')[:50]}")
                 to_delete.append(event_id)
             else:
-                print(f"   ✓ Link valid")
-                
-                # If URL changed (due to cleanup or redirects), update it
-                if cleaned_url != url:
-                    print(f"   (URL cleaned)")
-                    updates.append((cleaned_url, event_id))
-                
-                # Generate source_id if missing
-                cur.execute("SELECT source_id FROM events WHERE id = ?", (event_id,))
-                result = cur.fetchone()
-                if not result or not result[0]:
-                    source_id = f"{source_name or 'event'}_{uuid.uuid4().hex[:8]}"
-                    cur.execute("UPDATE events SET source_id = ? WHERE id = ?", (source_id, event_id))
-                    print(f"   (Added source_id)")
+                if self.verbose:
+                    print(f"   ✓ Link valid")
+                checked.append(event_id)
             
-            time.sleep(0.2)  # Rate limit
+            if not self.last_check_cached:
+                time.sleep(0.2)  # Rate limit (only after a real request)
         
-        # Apply updates
-        for new_url, event_id in updates:
-            cur.execute("UPDATE events SET source_url = ? WHERE id = ?", (new_url, event_id))
+        if self.url_cache:
+            self.url_cache.flush()
+        self.breaker.flush()
+        
+        mark_links_checked(cur, checked)
         
         # Delete broken events
         if to_delete:
-            placeholders = ','.join('?' * len(to_delete))
-            cur.execute(f"DELETE FROM events WHERE id IN ({placeholders})", to_delete)
+            cur.executemany("DELETE FROM events WHERE id = ?", [(event_id,) for event_id in to_delete])
             self.removed = len(to_delete)
         
-        self.updated = len(updates)
-        
         conn.commit()
-        conn.close()
-        
-        # Show results
-        conn = sqlite3.connect(DB_PATH)
-        cur = conn.cursor()
         total = cur.execute("SELECT COUNT(*) FROM events").fetchone()[0]
         conn.close()
         
         print("\n" + "="*70)
         print("✅ DATABASE ENHANCEMENT COMPLETE")
         print("="*70)
-        print(f"URL URLs cleaned:   {self.updated}")
+        print(f"URLs cleaned:         {self.updated}")
+        print(f"source_ids added:     {self.source_ids_added}")
         print(f"Broken links removed: {self.removed}")
+        print(f"Same-URL duplicates removed: {duplicates}")
+        print(f"Skipped (host down): {self.host_down}")
+        if self.url_cache:
+            print(f"URL cache hits / misses: {self.url_cache.hits} / {self.url_cache.misses}")
         print(f"Total events remaining: {total}")
+        shared_transport().report(since=transport_mark)
         print("="*70 + "\n")
         
-        # Show final events
-        self.show_events()
+        # Listing the whole table is slow on a large DB: only on request
+        if self.verbose:
+            self.show_events()
     
     def show_events(self):
         """Display all remaining events"""
@@ -184,5 +277,6 @@ class EventEnhancer:
 
 
 if __name__ == "__main__":
-    enhancer = EventEnhancer()
-    enhancer.enhance_database()
+    import sys
+    enhancer = EventEnhancer(verbose="--verbose" in sys.argv)
+    enhancer.enhance_database(full="--full" in sys.argv)
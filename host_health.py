@@ -0,0 +1,223 @@
+"""
+host_health.py
+
+Per-host circuit breaker shared by every stage that makes outbound HTTP
+requests (scraper fetches, LinkValidator and EventEnhancer URL checks).
+
+A host that is down or very slow used to cost a full request timeout on
+every call. After FAILURE_THRESHOLD consecutive failures (timeouts,
+connection errors, 5xx or 429 responses) the host's circuit opens and
+requests to it fail fast for COOLDOWN. Once the cool-down has passed the
+circuit is half-open: a single probe request is let through, which either
+closes the circuit again or re-opens it with a cool-down that doubles on
+every failed probe (capped at MAX_COOLDOWN).
+
+Host state is kept in the host_health table, so a new run starts with what
+the previous run learned instead of re-discovering it through timeouts.
+State changes are buffered and written in one transaction by flush().
+
+Usage:
+    breaker = shared_breaker()
+    if breaker.allow(url):
+        ...
+        breaker.record_response(url, response.status_code)   # or record_failure(url)
+    breaker.flush()
+"""
+
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+from db_schema import apply_schema
+
+DB_PATH = Path(__file__).parent / "database.db"
+
+FAILURE_THRESHOLD = 3
+COOLDOWN = timedelta(minutes=10)
+MAX_COOLDOWN = timedelta(hours=6)
+# A half-open probe that never reported back frees the slot after this long
+PROBE_TIMEOUT = timedelta(seconds=60)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class HostUnavailable(Exception):
+    """Raised when a request is refused because the host's circuit is open."""
+
+
+def host_of(url: str) -> str:
+    return urlparse(url).netloc.lower()
+
+
+class HostCircuitBreaker:
+    """Per-host circuit breaker backed by the host_health table."""
+
+    def __init__(self, db_path: Path = DB_PATH, failure_threshold: int = FAILURE_THRESHOLD,
+                 cooldown: timedelta = COOLDOWN):
+        self.db_path = db_path
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._hosts: Dict[str, Dict] = {}
+        self._probes: Dict[str, datetime] = {}
+        self._dirty: List[str] = []
+        self.fast_failures = 0
+        self.load()
+
+    def load(self):
+        """Ensure the schema exists and read the recorded host health into memory."""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            apply_schema(conn)
+            cur = conn.execute("SELECT * FROM host_health")
+            columns = [c[0] for c in cur.description]
+            rows = cur.fetchall()
+        finally:
+            conn.close()
+        for row in rows:
+            entry = dict(zip(columns, row))
+            self._hosts[entry.pop("host")] = entry
+
+    def entry(self, host: str) -> Dict:
+        """Return the state of `host`, creating a closed entry (lock must be held)."""
+        if host not in self._hosts:
+            self._hosts[host] = {
+                "state": CLOSED,
+                "consecutive_failures": 0,
+                "total_failures": 0,
+                "total_successes": 0,
+                "open_until": None,
+                "last_failure_at": None,
+                "last_success_at": None,
+            }
+        return self._hosts[host]
+
+    def allow(self, url: str) -> bool:
+        """Return True if a request to the host of `url` may be sent now."""
+        host = host_of(url)
+        now = datetime.now()
+        with self._lock:
+            entry = self._hosts.get(host)
+            if not entry or entry["state"] == CLOSED:
+                return True
+            if entry["state"] == OPEN and entry["open_until"] > now.isoformat(timespec="seconds"):
+                self.fast_failures += 1
+                return False
+
+            # Cool-down over: let a single probe through
+            probe_started = self._probes.get(host)
+            if probe_started and now - probe_started < PROBE_TIMEOUT:
+                self.fast_failures += 1
+                return False
+            self._probes[host] = now
+            if entry["state"] != HALF_OPEN:
+                entry["state"] = HALF_OPEN
+                self._dirty.append(host)
+            return True
+
+    def record_success(self, url: str):
+        """The host answered: close its circuit."""
+        host = host_of(url)
+        with self._lock:
+            entry = self.entry(host)
+            entry.update(
+                state=CLOSED,
+                consecutive_failures=0,
+                open_until=None,
+                total_successes=entry["total_successes"] + 1,
+                last_success_at=datetime.now().isoformat(timespec="seconds"),
+            )
+            self._probes.pop(host, None)
+            self._dirty.append(host)
+
+    def record_failure(self, url: str):
+        """The host timed out, refused the connection or returned a server error."""
+        host = host_of(url)
+        now = datetime.now()
+        with self._lock:
+            entry = self.entry(host)
+            failures = entry["consecutive_failures"] + 1
+            entry.update(
+                consecutive_failures=failures,
+                total_failures=entry["total_failures"] + 1,
+                last_failure_at=now.isoformat(timespec="seconds"),
+            )
+            if entry["state"] == HALF_OPEN or failures >= self.failure_threshold:
+                # Every failed probe doubles the cool-down
+                trips = max(failures - self.failure_threshold, 0)
+                cooldown = min(self.cooldown * (2 ** min(trips, 10)), MAX_COOLDOWN)
+                if entry["state"] != OPEN:
+                    print(f"  🔌 Circuit open for {host} ({failures} failures, "
+                          f"cooling down {int(cooldown.total_seconds() // 60)} min)")
+                entry.update(state=OPEN, open_until=(now + cooldown).isoformat(timespec="seconds"))
+            self._probes.pop(host, None)
+            self._dirty.append(host)
+
+    def record_response(self, url: str, status_code: int):
+        """Record an HTTP response; 5xx and 429 count as host failures."""
+        if status_code >= 500 or status_code == 429:
+            self.record_failure(url)
+        else:
+            self.record_success(url)
+
+    def state(self, url: str) -> Optional[str]:
+        with self._lock:
+            entry = self._hosts.get(host_of(url))
+            return entry["state"] if entry else None
+
+    def open_hosts(self) -> List[str]:
+        with self._lock:
+            return sorted(host for host, entry in self._hosts.items() if entry["state"] != CLOSED)
+
+    def flush(self):
+        """Write all host state changes since the last flush in one transaction."""
+        with self._lock:
+            rows = [
+                (
+                    host,
+                    self._hosts[host]["state"],
+                    self._hosts[host]["consecutive_failures"],
+                    self._hosts[host]["total_failures"],
+                    self._hosts[host]["total_successes"],
+                    self._hosts[host]["open_until"],
+                    self._hosts[host]["last_failure_at"],
+                    self._hosts[host]["last_success_at"],
+                )
+                for host in dict.fromkeys(self._dirty)
+            ]
+            self._dirty = []
+        if not rows:
+            return
+        conn = sqlite3.connect(self.db_path)
+        try:
+            with conn:
+                conn.executemany(
+                    """
+                    INSERT OR REPLACE INTO host_health (
+                        host, state, consecutive_failures, total_failures, total_successes,
+                        open_until, last_failure_at, last_success_at
+                    )
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    rows,
+                )
+        finally:
+            conn.close()
+
+
+_shared: Optional[HostCircuitBreaker] = None
+_shared_lock = threading.Lock()
+
+
+def shared_breaker() -> HostCircuitBreaker:
+    """Return the process-wide breaker, so all stages see the same host state."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = HostCircuitBreaker(DB_PATH)
+        return _shared
@@ -0,0 +1,116 @@
+"""
+http_cache.py
+
+Persistent on-disk cache for fetched pages, used to make conditional
+requests (If-None-Match / If-Modified-Since) so unchanged listing pages
+come back as a cheap 304 instead of a full download.
+
+Each cached URL is stored as one JSON file named after the SHA-256 of the
+URL, holding the validators and the response body. Entries are evicted
+when they have not been (re)validated for `max_age` seconds, and the
+oldest entries are dropped once the cache grows past `max_bytes`.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+CACHE_DIR = Path(__file__).parent / ".http_cache"
+
+
+class ResponseCache:
+    """Stores response bodies with their ETag / Last-Modified validators."""
+
+    def __init__(self, cache_dir: Path = CACHE_DIR,
+                 max_bytes: int = 50 * 1024 * 1024,
+                 max_age: float = 7 * 24 * 3600):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, url: str) -> Path:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, url: str) -> Optional[Dict]:
+        """Return the cached entry for `url`, or None if missing or expired."""
+        path = self._path(url)
+        try:
+            if time.time() - path.stat().st_mtime > self.max_age:
+                path.unlink(missing_ok=True)
+                return None
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return entry if entry.get("url") == url else None
+
+    @staticmethod
+    def conditional_headers(entry: Optional[Dict]) -> Dict[str, str]:
+        """Build If-None-Match / If-Modified-Since headers from an entry."""
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def store(self, url: str, body: str, etag: Optional[str], last_modified: Optional[str]):
+        """Cache a response body; responses without validators are not stored."""
+        if not etag and not last_modified:
+            return
+        entry = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "stored_at": time.time(),
+            "body": body,
+        }
+        path = self._path(url)
+        tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(tmp, path)
+        except OSError:
+            tmp.unlink(missing_ok=True)
+
+    def touch(self, url: str):
+        """Mark an entry as freshly revalidated (after a 304)."""
+        try:
+            os.utime(self._path(url))
+        except OSError:
+            pass
+
+    def prune(self) -> int:
+        """Apply age- and size-based eviction. Returns number of entries removed."""
+        removed = 0
+        now = time.time()
+        with self._lock:
+            files = []
+            for path in self.cache_dir.glob("*.json"):
+                try:
+                    st = path.stat()
+                except OSError:
+                    continue
+                if now - st.st_mtime > self.max_age:
+                    path.unlink(missing_ok=True)
+                    removed += 1
+                else:
+                    files.append((st.st_mtime, st.st_size, path))
+
+            total = sum(size for _, size, _ in files)
+            for _, size, path in sorted(files):
+                if total <= self.max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+                removed += 1
+        return removed
@@ -0,0 +1,272 @@
+"""
+http_transport.py
+
+Shared pooled HTTP transport used by the scraper, the link validator and
+the event enhancer.
+
+One requests.Session per process with keep-alive connection pools sized
+for the stages' thread pools, so every stage reuses connections to the
+hosts it talks to. On top of the session the transport adds:
+
+- retries of connection errors and 429/502/503/504 responses with jittered
+  exponential backoff, honoring Retry-After (timeouts are not retried; the
+  host circuit breaker deals with slow hosts),
+- a cap on response bodies (larger bodies are truncated, not buffered),
+- gzip/deflate (and brotli when installed) compression,
+- counters: requests, retries, errors, bytes, status classes, a latency
+  histogram and the connection reuse rate.
+
+The transport mirrors the Session.get / Session.head interface, so stages
+keep calling self.session.get(...) and tests can swap in a fake session.
+
+Usage:
+    transport = shared_transport()
+    mark = transport.snapshot()
+    response = transport.get(url, headers=..., timeout=8)
+    transport.report(since=mark)
+"""
+
+import random
+import threading
+import time
+from collections import defaultdict
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# User agents shared by all stages (rotated per request by the scraper)
+USER_AGENTS = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:122.0) Gecko/20100101 Firefox/122.0",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.2 Safari/605.1.15",
+]
+
+try:
+    import brotli  # noqa: F401  (lets urllib3 decode "br")
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+DEFAULT_TIMEOUT = 8
+RETRY_STATUSES = {429, 502, 503, 504}
+MAX_BODY_BYTES = 5 * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+
+# Upper bounds (seconds) of the latency histogram buckets; the last bucket is open
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0)
+
+
+class HttpTransport:
+    """Pooled keep-alive session with retries, body cap and metrics."""
+
+    def __init__(self, pool_connections: int = 32, pool_maxsize: int = 16,
+                 retries: int = 2, backoff: float = 0.5, max_backoff: float = 8.0,
+                 max_retry_after: float = 30.0, max_body_bytes: int = MAX_BODY_BYTES):
+        self.session = requests.Session()
+        # pool_connections: hosts kept alive; pool_maxsize: connections per host
+        self.adapter = HTTPAdapter(pool_connections=pool_connections,
+                                   pool_maxsize=pool_maxsize, max_retries=0)
+        self.session.mount("http://", self.adapter)
+        self.session.mount("https://", self.adapter)
+        self.session.headers.update({
+            "User-Agent": USER_AGENTS[0],
+            "Accept-Encoding": ACCEPT_ENCODING,
+        })
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_retry_after = max_retry_after
+        self.max_body_bytes = max_body_bytes
+
+        self._lock = threading.Lock()
+        self.counters: Dict[str, float] = defaultdict(float)
+        self.latency_histogram = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    # ===== Session interface =====
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault("allow_redirects", True)
+        return self.request("GET", url, **kwargs)
+
+    def head(self, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault("allow_redirects", False)
+        return self.request("HEAD", url, **kwargs)
+
+    def request(self, method: str, url: str, retries: Optional[int] = None,
+                max_body_bytes: Optional[int] = None, **kwargs) -> requests.Response:
+        """
+        Send a request, retrying connection errors and retryable statuses.
+
+        The body is read up to `max_body_bytes` (default: the transport's
+        cap) and the connection goes back to the pool. Raises the last
+        requests exception when every attempt failed.
+        """
+        kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+        retries = self.retries if retries is None else retries
+        limit = self.max_body_bytes if max_body_bytes is None else max_body_bytes
+
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            try:
+                response = self.session.request(method, url, stream=True, **kwargs)
+                self.read_body(response, limit)
+            except requests.RequestException as e:
+                self.record(time.perf_counter() - started, error=True)
+                retryable = isinstance(e, requests.ConnectionError) and not isinstance(e, requests.Timeout)
+                if not retryable or attempt >= retries:
+                    raise
+                delay = self.backoff_delay(attempt)
+            else:
+                self.record(time.perf_counter() - started, response=response)
+                if response.status_code not in RETRY_STATUSES or attempt >= retries:
+                    return response
+                delay = self.retry_delay(attempt, response.headers.get("Retry-After"))
+                if delay is None:
+                    return response  # Server asked for a longer wait than we allow
+
+            attempt += 1
+            self.count(retries=1)
+            time.sleep(delay)
+
+    # ===== Internals =====
+
+    def read_body(self, response: requests.Response, limit: int):
+        """Read (and decompress) at most `limit` bytes of the body, then release the connection."""
+        chunks = []
+        size = 0
+        truncated = False
+        for chunk in response.iter_content(CHUNK_SIZE):  # Also finishes HEAD responses
+            chunks.append(chunk)
+            size += len(chunk)
+            if size > limit:
+                truncated = True
+                break
+        body = b"".join(chunks)
+        wire_bytes = getattr(response.raw, "tell", lambda: len(body))()
+        if truncated:
+            body = body[:limit]
+            response.raw.close()  # Unread data left: the connection cannot be reused
+        response._content = body
+        response._content_consumed = True
+        response.truncated = truncated
+        response.close()  # Returns a fully read connection to the pool
+        self.count(body_bytes=len(body), wire_bytes=wire_bytes, truncated=int(truncated))
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Exponential backoff with jitter (between half and all of the step)."""
+        step = min(self.max_backoff, self.backoff * (2 ** attempt))
+        return step * random.uniform(0.5, 1.0)
+
+    def retry_delay(self, attempt: int, retry_after: Optional[str]) -> Optional[float]:
+        """Delay before the next attempt; None if Retry-After exceeds max_retry_after."""
+        if not retry_after:
+            return self.backoff_delay(attempt)
+        try:
+            delay = float(retry_after)
+        except ValueError:
+            try:
+                when = parsedate_to_datetime(retry_after)
+            except (TypeError, ValueError):
+                return self.backoff_delay(attempt)
+            if when.tzinfo is None:
+                when = when.replace(tzinfo=timezone.utc)
+            delay = (when - datetime.now(timezone.utc)).total_seconds()
+        delay = max(delay, 0.0)
+        return delay if delay <= self.max_retry_after else None
+
+    def count(self, **counts: float):
+        with self._lock:
+            for name, value in counts.items():
+                self.counters[name] += value
+
+    def record(self, seconds: float, response: Optional[requests.Response] = None, error: bool = False):
+        """Record one attempt in the counters and the latency histogram."""
+        bucket = next((i for i, bound in enumerate(LATENCY_BUCKETS) if seconds <= bound), len(LATENCY_BUCKETS))
+        with self._lock:
+            self.counters["requests"] += 1
+            self.counters["latency_total"] += seconds
+            self.latency_histogram[bucket] += 1
+            if error:
+                self.counters["errors"] += 1
+            if response is not None:
+                self.counters[f"status_{response.status_code // 100}xx"] += 1
+
+    def pool_totals(self) -> Dict[str, int]:
+        """New connections opened vs requests sent, over the pools still open."""
+        pools = self.adapter.poolmanager.pools
+        connections = requests_sent = 0
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is not None:
+                connections += pool.num_connections
+                requests_sent += pool.num_requests
+        return {"pool_connections": connections, "pool_requests": requests_sent}
+
+    # ===== Metrics =====
+
+    def snapshot(self) -> Dict:
+        """Copy of all counters, to report the activity of one stage with report(since=...)."""
+        with self._lock:
+            snap = dict(self.counters)
+            snap["latency_histogram"] = list(self.latency_histogram)
+        snap.update(self.pool_totals())
+        return snap
+
+    def stats(self, since: Optional[Dict] = None) -> Dict:
+        """Counters (minus the `since` snapshot) plus derived reuse rate and mean latency."""
+        now = self.snapshot()
+        since = since or {}
+        stats = {
+            key: value - since.get(key, 0)
+            for key, value in now.items() if key != "latency_histogram"
+        }
+        base = since.get("latency_histogram") or [0] * len(now["latency_histogram"])
+        stats["latency_histogram"] = [a - b for a, b in zip(now["latency_histogram"], base)]
+        sent = stats.get("pool_requests", 0)
+        stats["reuse_rate"] = 1 - stats.get("pool_connections", 0) / sent if sent else 0.0
+        requests_made = stats.get("requests", 0)
+        stats["mean_latency"] = stats.get("latency_total", 0) / requests_made if requests_made else 0.0
+        return stats
+
+    def report(self, since: Optional[Dict] = None):
+        """Print the transport metrics (optionally only those since a snapshot)."""
+        stats = self.stats(since)
+        if not stats.get("requests"):
+            return
+        statuses = ", ".join(
+            f"{key[7:]}: {int(value)}" for key, value in sorted(stats.items())
+            if key.startswith("status_") and value
+        )
+        labels = [f"<={bound:g}s" for bound in LATENCY_BUCKETS] + [f">{LATENCY_BUCKETS[-1]:g}s"]
+        histogram = "  ".join(
+            f"{label}: {count}" for label, count in zip(labels, stats["latency_histogram"]) if count
+        )
+        print(f"HTTP requests:        {int(stats['requests'])} "
+              f"({int(stats.get('retries', 0))} retries, {int(stats.get('errors', 0))} errors)")
+        if statuses:
+            print(f"HTTP statuses:        {statuses}")
+        print(f"Downloaded:           {stats.get('wire_bytes', 0) / 1024:.0f} KB "
+              f"({stats.get('body_bytes', 0) / 1024:.0f} KB decoded, "
+              f"{int(stats.get('truncated', 0))} bodies truncated)")
+        print(f"Connection reuse:     {stats['reuse_rate']:.0%}")
+        print(f"Mean latency:         {stats['mean_latency'] * 1000:.0f} ms")
+        print(f"Latency histogram:    {histogram}")
+
+
+_shared: Optional[HttpTransport] = None
+_shared_lock = threading.Lock()
+
+
+def shared_transport() -> HttpTransport:
+    """Return the process-wide transport, so all stages share its connection pools."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = HttpTransport()
+        return _shared
@@ -0,0 +1,232 @@
+"""
+link_scheduler.py
+
+Budgeted link checks that keep the most-clicked events fresh first.
+
+Scheduled runs cannot afford to re-check every URL each cycle. The
+scheduler ranks every event whose link was not checked within
+MIN_RECHECK by:
+
+- visibility: AI-approved events (is_valid = 1) are the ones users see,
+- how soon the event happens (past events rank lowest),
+- time since the link was last checked (never checked or changed URL = most stale),
+
+and works down that list until the wall-clock or request budget is spent.
+Events it did not reach are stored in the link_check_queue table; every run
+they are deferred raises their priority, so the backlog is worked through
+across runs instead of starting from the top each time.
+
+Run:
+    python link_scheduler.py                  # 5-minute budget
+    python link_scheduler.py --seconds 60
+    python link_scheduler.py --requests 200   # At most ~200 network checks
+"""
+
+import argparse
+import sqlite3
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import List, Optional
+
+from db_schema import apply_schema
+from host_health import HostUnavailable
+from http_transport import shared_transport
+from link_validator import LINK_STALE_AFTER, LinkValidator
+from url_canonical import canonical_url
+
+DB_PATH = Path(__file__).parent / "database.db"
+
+# Links checked more recently than this are not candidates
+MIN_RECHECK = timedelta(hours=6)
+
+# Priority weights
+VISIBLE_WEIGHT = 3.0
+SOON_WEIGHT = 2.0
+STALE_WEIGHT = 1.0
+DEFERRED_WEIGHT = 0.5
+UNKNOWN_DATE_SOONNESS = 0.25
+
+
+class LinkCheckScheduler:
+    """Checks event links in priority order within a time or request budget."""
+
+    def __init__(self, validator: Optional[LinkValidator] = None,
+                 time_budget: Optional[float] = 300.0, request_budget: Optional[int] = None):
+        self.validator = validator or LinkValidator()
+        self.time_budget = time_budget
+        self.request_budget = request_budget
+        self.checked = 0
+        self.removed = 0
+        self.host_down = 0
+        self.deferred = 0
+
+    def priority(self, event_date: Optional[str], is_valid: int, url: str,
+                 checked_at: Optional[str], checked_url: Optional[str],
+                 deferred_runs: int, today: date, now: datetime) -> float:
+        """Higher is checked first."""
+        day = self.validator.rules.event_date(event_date)
+        if day is None:
+            soonness = UNKNOWN_DATE_SOONNESS
+        elif day < today:
+            soonness = 0.0
+        else:
+            soonness = 1 / (1 + (day - today).days / 7)  # today 1.0, in a week 0.5
+
+        if not checked_at or checked_url != url:
+            staleness = 1.0
+        else:
+            age = now - datetime.fromisoformat(checked_at)
+            staleness = min(age / LINK_STALE_AFTER, 1.0)
+
+        return (VISIBLE_WEIGHT * (is_valid == 1)
+                + SOON_WEIGHT * soonness
+                + STALE_WEIGHT * staleness
+                + DEFERRED_WEIGHT * (deferred_runs or 0))
+
+    def candidates(self, conn) -> List[tuple]:
+        """(priority, id, title, url, deferred_runs) of every candidate, best first."""
+        now = datetime.now()
+        rows = conn.execute(
+            """
+            SELECT e.id, e.title, e.date, e.is_valid, e.source_url,
+                   e.link_checked_at, e.link_checked_url, q.deferred_runs
+            FROM events AS e
+            LEFT JOIN link_check_queue AS q ON q.event_id = e.id
+            WHERE e.source_url LIKE 'http%'
+              AND (e.link_checked_at IS NULL
+                   OR e.link_checked_url IS NOT e.source_url
+                   OR e.link_checked_at < ?)
+            """,
+            ((now - MIN_RECHECK).isoformat(timespec="seconds"),),
+        ).fetchall()
+        ranked = [
+            (self.priority(event_date, is_valid, url, checked_at, checked_url, deferred, now.date(), now),
+             event_id, title, url, deferred or 0)
+            for event_id, title, event_date, is_valid, url, checked_at, checked_url, deferred in rows
+        ]
+        ranked.sort(key=lambda c: (-c[0], c[1]))
+        return ranked
+
+    def budget_spent(self, started: float, requests_sent: int) -> bool:
+        if self.time_budget is not None and time.perf_counter() - started >= self.time_budget:
+            return True
+        return self.request_budget is not None and requests_sent >= self.request_budget
+
+    def run(self):
+        """Check links in priority order until the budget is spent."""
+        conn = sqlite3.connect(DB_PATH)
+        apply_schema(conn)
+        cur = conn.cursor()
+
+        print("\n" + "=" * 70)
+        print("⏱️  BUDGETED LINK CHECKS")
+        print("=" * 70 + "\n")
+
+        queue = self.candidates(conn)
+        carried = sum(1 for c in queue if c[4])
+        budget = []
+        if self.time_budget is not None:
+            budget.append(f"{self.time_budget:g}s")
+        if self.request_budget is not None:
+            budget.append(f"{self.request_budget} requests")
+        print(f"📊 {len(queue)} links due ({carried} carried over from earlier runs); "
+              f"budget: {' / '.join(budget) or 'unlimited'}\n")
+
+        invalid_ids = []
+        redirects = []
+        checked_ids = []
+        deferred = []
+        started = time.perf_counter()
+        transport_mark = shared_transport().snapshot()
+        checks_before = self.validator.network_checks
+        window = self.validator.concurrency * 2  # Candidates read ahead into the per-host queues
+
+        def collect(future, candidate):
+            try:
+                is_valid, final_url = future.result()
+            except HostUnavailable:
+                self.host_down += 1
+                deferred.append(candidate)
+                return
+            except Exception:
+                is_valid, final_url = False, None
+            record(candidate, is_valid, final_url)
+
+        def record(candidate, is_valid, final_url):
+            _, event_id, title, url, _ = candidate
+            self.checked += 1
+            if not is_valid:
+                print(f"  ❌ Link broken - REMOVING: {(title or '')[:50]}")
+                invalid_ids.append(event_id)
+            else:
+                checked_ids.append(event_id)
+                if final_url and final_url != url:
+                    redirects.append((final_url, canonical_url(final_url), event_id))
+
+        position = 0
+        submitted = 0
+
+        def due_checks():
+            """Candidates in priority order until the budget is spent."""
+            nonlocal position, submitted
+            while position < len(queue) and not self.budget_spent(started, submitted):
+                candidate = queue[position]
+                position += 1
+
+                # Fresh cached results are free: only network checks use the budget
+                cached = self.validator.url_cache.get(candidate[3]) if self.validator.url_cache else None
+                if cached is not None:
+                    record(candidate, *cached)
+                    continue
+                submitted += 1
+                yield candidate
+
+        for candidate, future in self.validator.check_urls(due_checks(), lambda c: c[3], window):
+            collect(future, candidate)
+        elapsed = time.perf_counter() - started
+
+        if self.validator.url_cache:
+            self.validator.url_cache.flush()
+        self.validator.breaker.flush()
+
+        # Outcomes and the persisted backlog in one transaction
+        deferred.extend(queue[position:])
+        now = datetime.now().isoformat(timespec="seconds")
+        with conn:
+            self.validator.apply_results(cur, invalid_ids, redirects, checked_ids)
+            cur.execute("DELETE FROM link_check_queue")
+            cur.executemany(
+                "INSERT INTO link_check_queue (event_id, priority, deferred_runs, queued_at) VALUES (?, ?, ?, ?)",
+                [(event_id, priority, runs + 1, now) for priority, event_id, _, _, runs in deferred],
+            )
+        conn.close()
+        self.removed = len(invalid_ids)
+        self.deferred = len(deferred)
+
+        print("\n" + "=" * 70)
+        print("📊 LINK CHECK SUMMARY")
+        print("=" * 70)
+        print(f"Links checked:         {self.checked} in {elapsed:.1f}s")
+        print(f"Network checks:        {self.validator.network_checks - checks_before}")
+        print(f"Removed (broken link): {self.removed}")
+        print(f"Redirects updated:     {len(redirects)}")
+        print(f"Skipped (host down):   {self.host_down}")
+        print(f"Deferred to next run:  {self.deferred}")
+        shared_transport().report(since=transport_mark)
+        print("=" * 70 + "\n")
+        return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Budgeted, prioritized link checks")
+    parser.add_argument("--seconds", type=float, default=300.0, help="Wall-clock budget (default: 300)")
+    parser.add_argument("--requests", type=int, default=None, help="Network check budget (default: none)")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent link checks (default: 8)")
+    args = parser.parse_args()
+    LinkCheckScheduler(LinkValidator(concurrency=args.workers),
+                       time_budget=args.seconds, request_budget=args.requests).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -9,172 +9,338 @@ Features:
 - Extracts real event dates and locations
 - Filters out university-restricted events
 - Ensures links point to booking pages
+- Checks links concurrently with global and per-host in-flight limits
+- Reuses recent check results from the shared url_checks cache
+- Only re-checks new, changed or stale rows unless a full sweep is requested
 
 Run:
-    python link_validator.py
+    python link_validator.py          # New, changed or stale links only
+    python link_validator.py --full   # Re-check every link
 """
 
 import sqlite3
 import requests
+import threading
 import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Tuple, Optional
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, Tuple, Optional
 from urllib.parse import urlparse
-import re
+
+from content_filters import FilterRules, load_filter_rules
+from db_schema import apply_schema
+from host_health import HostUnavailable, shared_breaker
+from http_transport import USER_AGENTS, shared_transport
+from url_canonical import LISTING_KEY_CONDITION, canonical_url, remove_canonical_duplicates
+from url_health import UrlHealthCache
 
 DB_PATH = Path(__file__).parent / "database.db"
 
-USER_AGENTS = [
-    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36",
-    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36",
-]
+# A validated link is re-checked after this long even if its URL is unchanged
+LINK_STALE_AFTER = timedelta(days=3)
+
+# Rows whose link needs checking: never checked, URL changed since, or stale
+LINK_DUE_CONDITION = (
+    "(link_checked_at IS NULL OR link_checked_url IS NOT source_url OR link_checked_at < ?)"
+)
+
+
+def link_stale_before() -> str:
+    """Timestamp before which a link check counts as stale (LINK_DUE_CONDITION parameter)."""
+    return (datetime.now() - LINK_STALE_AFTER).isoformat(timespec="seconds")
+
+
+def link_check_due(checked_at: Optional[str], checked_url: Optional[str], url: Optional[str],
+                   stale_before: str) -> bool:
+    """Python twin of LINK_DUE_CONDITION for rows that are already loaded."""
+    return checked_at is None or checked_url != url or checked_at < stale_before
+
+
+def mark_links_checked(cur, event_ids):
+    """Record that the current source_url of these events has just been validated."""
+    now = datetime.now().isoformat(timespec="seconds")
+    cur.executemany(
+        "UPDATE events SET link_checked_at = ?, link_checked_url = source_url WHERE id = ?",
+        [(now, event_id) for event_id in event_ids],
+    )
+
+
+class HostQueues:
+    """
+    Per-host FIFO queues of pending link checks, handed out round-robin
+    across hosts and only while the host has a free in-flight slot.
+    """
+
+    def __init__(self, per_host: int):
+        self.per_host = per_host
+        self.queues: Dict[str, Deque] = {}
+        self.hosts: Deque[str] = deque()  # Hosts with queued items, in round-robin order
+        self.in_flight: Dict[str, int] = {}
+        self.queued = 0
+
+    def __len__(self) -> int:
+        return self.queued
+
+    def push(self, url: str, item):
+        host = urlparse(url or "").netloc.lower()
+        if host not in self.queues:
+            self.queues[host] = deque()
+            self.hosts.append(host)
+        self.queues[host].append(item)
+        self.queued += 1
+
+    def pop_ready(self) -> Optional[Tuple[str, Any]]:
+        """Take (host, item) from the next host below its slot limit, or None."""
+        for _ in range(len(self.hosts)):
+            host = self.hosts[0]
+            self.hosts.rotate(-1)
+            if self.in_flight.get(host, 0) >= self.per_host:
+                continue
+            queue = self.queues[host]
+            item = queue.popleft()
+            if not queue:
+                del self.queues[host]
+                self.hosts.pop()  # Just rotated to the back
+            self.queued -= 1
+            self.in_flight[host] = self.in_flight.get(host, 0) + 1
+            return host, item
+        return None
+
+    def release(self, host: str):
+        self.in_flight[host] -= 1
 
 
 class LinkValidator:
     """Validates and cleans event links"""
     
-    def __init__(self):
-        self.session = requests.Session()
+    def __init__(self, concurrency: int = 8, per_host: int = 2, use_url_cache: bool = True,
+                 rules: Optional[FilterRules] = None):
+        self.session = shared_transport()
+        self.rules = rules or load_filter_rules()
+        self.url_cache = UrlHealthCache(DB_PATH) if use_url_cache else None
+        self.breaker = shared_breaker()
+        self.concurrency = max(1, concurrency)
+        self.per_host = max(1, per_host)
+        self._lock = threading.Lock()
+        self.network_checks = 0  # validate_url calls not answered from the cache
         self.removed_count = 0
         self.validated_count = 0
         self.errors = 0
+        self.host_down = 0
         
     def validate_url(self, url: str, timeout: int = 8) -> Tuple[bool, Optional[str]]:
         """
-        Validate if URL works.
+        Validate if URL works, answering from the URL health cache when fresh.
+        
+        Per-host limits are not applied here; run concurrent checks through
+        check_urls, which schedules them.
         
         Returns:
             (is_valid, final_url)
+        
+        Raises:
+            HostUnavailable: the host's circuit is open; the link was not checked.
         """
         if not url or not url.startswith('http'):
             return False, None
         
+        if self.url_cache:
+            cached = self.url_cache.get(url)
+            if cached is not None:
+                return cached
+        
+        if not self.breaker.allow(url):
+            raise HostUnavailable(url)
+        with self._lock:
+            self.network_checks += 1
+        result = self.request_url(url, timeout)
+        if self.url_cache:
+            self.url_cache.record(url, *result)
+        return result
+    
+    def check_urls(self, items: Iterable, url_of: Callable[[Any], str],
+                   lookahead: Optional[int] = None) -> Iterator[Tuple[Any, Future]]:
+        """
+        Validate the URL of every item on `concurrency` pool workers and
+        yield (item, finished future) as the checks complete.
+        
+        Per-host limits are applied here, before submitting, rather than in
+        the workers: items wait in per-host queues and are submitted
+        round-robin across hosts only while their host has fewer than
+        `per_host` checks in flight, so a host with many links never ties up
+        the whole pool. At most `lookahead` items (all when None) are read
+        ahead from `items` into the queues.
+        """
+        items = iter(items)
+        queues = HostQueues(self.per_host)
+        exhausted = False
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            pending: Dict[Future, Tuple[str, Any]] = {}
+            while True:
+                while not exhausted and (lookahead is None or len(queues) < lookahead):
+                    try:
+                        item = next(items)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    queues.push(url_of(item), item)
+                while len(pending) < self.concurrency:
+                    ready = queues.pop_ready()
+                    if ready is None:
+                        break
+                    host, item = ready
+                    pending[pool.submit(self.validate_url, url_of(item))] = (host, item)
+                if not pending:
+                    break  # Nothing in flight means nothing is queued either
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    host, item = pending.pop(future)
+                    queues.release(host)
+                    yield item, future
+    
+    def request_url(self, url: str, timeout: int = 8) -> Tuple[bool, Optional[str]]:
+        """
+        Check the URL over the network (HEAD, falling back to GET on timeout).
+        
+        Outcomes are reported to the host circuit breaker; the GET retry is
+        only sent while the host's circuit is still closed.
+        """
+        headers = {"User-Agent": USER_AGENTS[0]}
         try:
-            headers = {"User-Agent": USER_AGENTS[0]}
-            
             # Follow redirects and check final URL
             response = self.session.head(url, headers=headers, timeout=timeout, allow_redirects=True)
-            
-            # Check status code
-            if response.status_code == 404:
+        except (requests.Timeout, requests.ConnectionError) as e:
+            self.breaker.record_failure(url)
+            if self.breaker.state(url) != "closed":
+                raise HostUnavailable(url)  # This failure tripped the circuit
+            if not isinstance(e, requests.Timeout):
                 return False, None
-            if response.status_code >= 400:
-                return False, None
-            
-            # Return final URL after redirects
-            return True, response.url
-            
-        except requests.Timeout:
             # Timeouts are suspicious, but try GET
             try:
                 response = self.session.get(url, headers=headers, timeout=timeout, allow_redirects=True)
-                if response.status_code == 404:
-                    return False, None
-                return response.status_code < 400, response.url
-            except:
+            except (requests.Timeout, requests.ConnectionError):
+                self.breaker.record_failure(url)
+                return False, None
+            except Exception:
                 return False, None
         except Exception as e:
             return False, None
+        
+        self.breaker.record_response(url, response.status_code)
+        
+        # Check status code
+        if response.status_code >= 400:
+            return False, None
+        
+        # Return final URL after redirects
+        return True, response.url
     
     def is_university_only(self, title: str, location: str) -> bool:
-        """Check if event is restricted to university students"""
-        restricted_keywords = [
-            "student only",
-            "university of",
-            "imperial college",
-            "ucl only",
-            "kcl only",
-            "qmul only",
-            "for students",
-            "student event",
-            "alumni only",
-            "staff only",
-            "member only",
-            "internal event",
-        ]
-        
-        combined = f"{title} {location}".lower()
-        
-        for keyword in restricted_keywords:
-            if keyword in combined:
-                return True
-        
-        return False
+        """Check if event is restricted to university students (see filter_rules.json)"""
+        return self.rules.is_restricted(title, location)
     
     def extract_date(self, title: str) -> Optional[str]:
         """Try to extract date from title"""
-        # Look for common date patterns
-        date_patterns = [
-            r'\d{1,2}\s+(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{4}',
-            r'(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{1,2}(?:st|nd|rd|th)?\s*,?\s*\d{4}',
-            r'\d{1,2}/\d{1,2}/\d{4}',
-            r'\d{4}-\d{1,2}-\d{1,2}',
-        ]
-        
-        for pattern in date_patterns:
-            match = re.search(pattern, title, re.IGNORECASE)
-            if match:
-                return match.group(0)
-        
-        return None
+        return self.rules.extract_date(title)
     
-    def clean_database(self):
-        """Remove invalid events from database"""
+    def clean_database(self, full: bool = False):
+        """
+        Remove invalid events from database.
+        
+        By default only rows that are new, whose URL changed since it was
+        last validated, or whose last check is stale are processed;
+        `full=True` sweeps the whole table.
+        """
         conn = sqlite3.connect(DB_PATH)
+        apply_schema(conn)
         cur = conn.cursor()
         
         print("\n" + "="*70)
         print("🔗 LINK VALIDATION & DATABASE CLEANUP")
         print("="*70 + "\n")
         
-        # Get all events with URLs
-        rows = cur.execute(
-            "SELECT id, title, source_url, location FROM events"
-        ).fetchall()
+        # Same event under another URL variant: drop it before any HTTP work
+        duplicates = remove_canonical_duplicates(conn)
+        if duplicates:
+            print(f"🧬 Removed {duplicates} events duplicating an earlier event's URL\n")
+        
+        # Get the events whose links need checking
+        if full:
+            rows = cur.execute(
+                "SELECT id, title, source_url, location FROM events"
+            ).fetchall()
+        else:
+            rows = cur.execute(
+                f"SELECT id, title, source_url, location FROM events WHERE {LINK_DUE_CONDITION}",
+                (link_stale_before(),),
+            ).fetchall()
+        total = cur.execute("SELECT COUNT(*) FROM events").fetchone()[0]
         
-        print(f"📊 Checking {len(rows)} events...\n")
+        print(f"📊 Checking {len(rows)} of {total} events "
+              f"({'full sweep' if full else 'new, changed or stale only'}; "
+              f"{self.concurrency} in flight, {self.per_host} per host)...\n")
         
         invalid_ids = []
+        redirects = []
+        checked_ids = []
+        to_check = []
         
-        for event_id, title, url, location in rows:
+        # Cheap local checks first, for the whole batch; only the survivors hit the network
+        restricted = self.rules.classify_batch((title, location) for _, title, _, location in rows)
+        for (event_id, title, url, location), is_restricted in zip(rows, restricted):
             if not url:
                 print(f"  ❌ ID {event_id}: No URL - REMOVING")
                 invalid_ids.append(event_id)
-                self.removed_count += 1
                 continue
             
             # Check if university-only
-            if self.is_university_only(title, location or ""):
+            if is_restricted:
                 print(f"  ❌ ID {event_id}: University-only event - REMOVING")
                 invalid_ids.append(event_id)
-                self.removed_count += 1
                 continue
             
-            # Validate URL
-            print(f"  🔍 Checking: {title[:50]}...")
-            is_valid, final_url = self.validate_url(url)
+            to_check.append((event_id, title, url))
+        
+        started = time.perf_counter()
+        transport_mark = shared_transport().snapshot()
+        checked = 0
+        for (event_id, title, url), future in self.check_urls(to_check, lambda item: item[2]):
+            checked += 1
+            try:
+                is_valid, final_url = future.result()
+            except HostUnavailable:
+                # Host is down: keep the event and check it on a later run
+                self.host_down += 1
+                continue
+            except Exception:
+                self.errors += 1
+                is_valid, final_url = False, None
             
             if not is_valid:
-                print(f"     ❌ Link broken (404/error) - REMOVING")
+                print(f"  ❌ Link broken (404/error) - REMOVING: {title[:50]}")
                 invalid_ids.append(event_id)
-                self.removed_count += 1
             else:
-                print(f"     ✓ Link valid")
                 self.validated_count += 1
-                
+                checked_ids.append(event_id)
                 # Update with final URL if different (handles redirects)
                 if final_url and final_url != url:
-                    cur.execute("UPDATE events SET source_url = ? WHERE id = ?", (final_url, event_id))
-                    print(f"     (Redirect updated)")
+                    redirects.append((final_url, canonical_url(final_url), event_id))
             
-            time.sleep(0.5)  # Rate limiting
+            if checked % 25 == 0 or checked == len(to_check):
+                rate = checked / max(time.perf_counter() - started, 1e-9)
+                print(f"  ⏳ {checked}/{len(to_check)} links checked ({rate:.1f}/s)")
+        elapsed = time.perf_counter() - started
+        if self.url_cache:
+            self.url_cache.flush()
+        self.breaker.flush()
         
-        # Delete invalid events
+        # Apply all mutations in one transaction
+        self.removed_count = len(invalid_ids)
+        with conn:
+            self.apply_results(cur, invalid_ids, redirects, checked_ids)
         if invalid_ids:
-            placeholders = ','.join('?' * len(invalid_ids))
-            cur.execute(f"DELETE FROM events WHERE id IN ({placeholders})", invalid_ids)
-            conn.commit()
             print(f"\n✓ Deleted {self.removed_count} invalid events")
         
         conn.close()
@@ -184,13 +350,45 @@ class LinkValidator:
         print("="*70)
         print(f"Valid events:          {self.validated_count}")
         print(f"Removed (broken link): {self.removed_count}")
-        print(f"Remaining:             {self.validated_count}")
+        print(f"Removed (same URL):    {duplicates}")
+        print(f"Redirects updated:     {len(redirects)}")
+        print(f"Skipped (host down):   {self.host_down}")
+        print(f"Remaining:             {total - self.removed_count}")
+        print(f"Links checked:         {checked} in {elapsed:.1f}s "
+              f"({checked / max(elapsed, 1e-9):.1f}/s)")
+        if self.url_cache:
+            print(f"Cache hits / misses:   {self.url_cache.hits} / {self.url_cache.misses}")
+        shared_transport().report(since=transport_mark)
         print("="*70 + "\n")
+    
+    def apply_results(self, cur, invalid_ids, redirects, checked_ids):
+        """
+        Write link check outcomes: follow redirects, mark valid links checked
+        and delete events with broken links. The caller owns the transaction.
+        
+        `redirects` holds (final_url, canonical_url, event_id) tuples; listing
+        keys (see url_canonical.py) are kept.
+        """
+        if redirects:
+            cur.executemany(
+                f"""
+                UPDATE events
+                SET source_url = ?,
+                    canonical_url = CASE WHEN {LISTING_KEY_CONDITION} THEN canonical_url ELSE ? END
+                WHERE id = ?
+                """,
+                redirects,
+            )
+        mark_links_checked(cur, checked_ids)
+        if invalid_ids:
+            placeholders = ','.join('?' * len(invalid_ids))
+            cur.execute(f"DELETE FROM events WHERE id IN ({placeholders})", invalid_ids)
 
 
 def main():
+    import sys
     validator = LinkValidator()
-    validator.clean_database()
+    validator.clean_database(full="--full" in sys.argv)
 
 
 if __name__ == "__main__":
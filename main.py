@@ -8,6 +8,8 @@ It handles scraping, AI validation, and web server automatically.
 Usage:
     python main.py                    # Full workflow (scrape + validate + serve)
     python main.py --scrape-only      # Just fetch events
+    python main.py --scrape-only --concurrency 8   # Fetch 8 sources in parallel
+    python main.py --scrape-only --deep-crawl      # Follow pagination on every source
     python main.py --validate-only    # Just validate events
     python main.py --serve-only       # Just start web server
     python main.py --schedule         # Run scraper on a schedule
@@ -39,10 +41,25 @@ class EventFinder:
     def __init__(self):
         self.project_root = PROJECT_ROOT
         self.api_key = os.getenv("OPENAI_API_KEY")
+        self.model_base_url = os.getenv("OPENAI_BASE_URL")
+        self.scrape_concurrency = 1
+        self.use_http_cache = True
+        self.parse_workers = 0
+        self.skip_unchanged_sources = True
+        self.poll_all_sources = False
+        self.deep_crawl = False
+        self.max_pages = None
+        self.max_events = None
+        self.link_workers = 8
+        self.full_sweep = False
+        self.link_budget_seconds = 300.0
+        self.link_budget_requests = None
+        self.ai_workers = 4
+        self.ai_rpm = 60
         
     def check_api_key(self):
-        """Verify API key is set"""
-        if not self.api_key:
+        """Verify API key is set (a local model backend via OPENAI_BASE_URL needs none)"""
+        if not self.api_key and not self.model_base_url:
             print("\n[FAIL] ERROR: OPENAI_API_KEY not found in .env")
             print("   Please set your API key: https://platform.openai.com/api-keys")
             return False
@@ -57,127 +74,57 @@ class EventFinder:
         try:
             # Import and run advanced scraper
             import scraper_advanced
-            scraper_advanced.scrape_london_tech_events()
+            scraper_advanced.scrape_london_tech_events(
+                concurrency=self.scrape_concurrency,
+                use_cache=self.use_http_cache,
+                parse_workers=self.parse_workers,
+                skip_unchanged=self.skip_unchanged_sources,
+                poll_all=self.poll_all_sources,
+                deep_crawl=self.deep_crawl,
+                max_pages=self.max_pages,
+                max_events=self.max_events,
+            )
             print("\n[OK] Scraping completed successfully!")
             return True
         except Exception as e:
             print(f"\n[ERROR] Scraping failed: {e}")
             return False
     
-    def remove_duplicates(self):
-        """Remove duplicate events from database"""
+    def run_cleaning_stage(self, check_links=True):
+        """Dedupe, drop bad rows, check and clean URLs in one pass over the table"""
         print("\n" + "="*60)
-        print(">> Removing Duplicate Events")
+        print(">> Cleaning Events (single pass)")
         print("="*60)
         
         try:
-            import sqlite3
-            conn = sqlite3.connect(self.project_root / "database.db")
-            cur = conn.cursor()
-            
-            # Find duplicates: same title, location, and date
-            duplicates = cur.execute("""
-                SELECT id, title FROM events 
-                WHERE id NOT IN (
-                    SELECT MIN(id) FROM events 
-                    GROUP BY LOWER(TRIM(title)), LOWER(TRIM(location)), date
-                )
-                ORDER BY id DESC
-            """).fetchall()
-            
-            if duplicates:
-                dup_count = len(duplicates)
-                dup_ids = [str(row[0]) for row in duplicates]
-                print(f"\n[Found] {dup_count} duplicate events\n")
-                
-                for event_id, title in duplicates:
-                    print(f"  [DELETE] Removing duplicate: {title[:50]}...")
-                
-                # Delete duplicates
-                cur.execute(f"DELETE FROM events WHERE id IN ({','.join(dup_ids)})")
-                conn.commit()
-                print(f"\n[OK] Removed {dup_count} duplicate events")
-            else:
-                print("\n[OK] No duplicates found")
-            
-            conn.close()
-            return True
-        except Exception as e:
-            print(f"\n[ERROR] Duplicate removal failed: {e}")
-            return False
-    
-    def clean_broken_urls(self):
-        """Remove events with broken/relative URLs"""
-        print("\n" + "="*60)
-        print(">> Cleaning Broken URLs")
-        print("="*60)
-        
-        try:
-            import sqlite3
-            conn = sqlite3.connect(self.project_root / "database.db")
-            cur = conn.cursor()
-            
-            # Remove relative URLs (starting with /)
-            bad_urls = cur.execute("SELECT id, title FROM events WHERE source_url LIKE '/%'").fetchall()
-            
-            if bad_urls:
-                bad_count = len(bad_urls)
-                bad_ids = [str(row[0]) for row in bad_urls]
-                print(f"\n[Found] {bad_count} events with broken relative URLs\n")
-                
-                for event_id, title in bad_urls[:10]:  # Show first 10
-                    print(f"  [DELETE] Removing: {title[:50]}...")
-                
-                if bad_count > 10:
-                    print(f"  ... and {bad_count - 10} more")
-                
-                # Delete them
-                cur.execute(f"DELETE FROM events WHERE id IN ({','.join(bad_ids)})")
-                conn.commit()
-                print(f"\n[OK] Removed {bad_count} events with broken URLs")
-            else:
-                print("\n[OK] No broken relative URLs found")
-            
-            conn.close()
+            import cleaning_pipeline
+            cleaning_pipeline.CleaningPipeline(concurrency=self.link_workers).run(
+                full=self.full_sweep, check_links=check_links
+            )
+            print("\n[OK] Cleaning completed!")
             return True
         except Exception as e:
-            print(f"\n[ERROR] URL cleaning failed: {e}")
+            print(f"\n[ERROR] Cleaning failed: {e}")
             return False
     
-    def validate_event_urls(self):
-        """Validate that event URLs actually work"""
+    def run_link_scheduler(self):
+        """Check links within a budget, soonest and visible events first"""
         print("\n" + "="*60)
-        print(">> Validating Event URL Accessibility")
+        print(">> Checking Event Links (budgeted)")
         print("="*60)
         
         try:
-            # Import and run link validator
+            import link_scheduler
             import link_validator
-            validator = link_validator.LinkValidator()
-            validator.clean_database()
-            print("\n[OK] URL validation completed!")
-            return True
-        except Exception as e:
-            print(f"\n[WARN] URL validation skipped: {e}")
-            # Don't fail the entire pipeline for this
-            return True
-    
-    def enhance_event_data(self):
-        """Enhance events with better data and remove invalid ones"""
-        print("\n" + "="*60)
-        print(">> Enhancing Event Data Quality")
-        print("="*60)
-        
-        try:
-            # Import and run event enhancer
-            import enhance_events
-            enhancer = enhance_events.EventEnhancer()
-            enhancer.enhance_database()
-            print("\n[OK] Event enhancement completed!")
+            link_scheduler.LinkCheckScheduler(
+                link_validator.LinkValidator(concurrency=self.link_workers),
+                time_budget=self.link_budget_seconds,
+                request_budget=self.link_budget_requests,
+            ).run()
+            print("\n[OK] Link checks completed!")
             return True
         except Exception as e:
-            print(f"\n[WARN] Event enhancement skipped: {e}")
-            # Don't fail the entire pipeline for this
+            print(f"\n[WARN] Link checks skipped: {e}")
             return True
     
     def run_ai_cleaner(self):
@@ -189,7 +136,7 @@ class EventFinder:
         try:
             # Import and run AI cleaner
             import ai_cleaner
-            ai_cleaner.main()
+            ai_cleaner.main(drain=True, workers=self.ai_workers, requests_per_minute=self.ai_rpm)
             print("\n[OK] AI validation completed successfully!")
             return True
         except Exception as e:
@@ -226,27 +173,15 @@ class EventFinder:
         if not self.run_scraper():
             print("\n[WARN]  Scraping failed, but continuing with existing data...")
         
-        # Step 2: Remove duplicates
-        if not self.remove_duplicates():
-            print("\n[WARN]  Duplicate removal failed, continuing...")
+        # Step 2: Dedupe, remove broken/restricted events, validate and clean URLs
+        if not self.run_cleaning_stage():
+            print("\n[WARN]  Cleaning failed, continuing...")
         
-        # Step 3: Clean broken URLs
-        if not self.clean_broken_urls():
-            print("\n[WARN]  URL cleaning failed, continuing...")
-        
-        # Step 4: Validate event URLs
-        if not self.validate_event_urls():
-            print("\n[WARN]  URL validation failed, continuing...")
-        
-        # Step 5: Enhance event data
-        if not self.enhance_event_data():
-            print("\n[WARN]  Event enhancement failed, continuing...")
-        
-        # Step 6: Validate with AI
+        # Step 3: Validate with AI
         if not self.run_ai_cleaner():
             print("\n[WARN]  AI validation failed, but continuing...")
         
-        # Step 7: Serve
+        # Step 4: Serve
         self.run_server()
     
     def run_scheduled(self, interval_hours=24):
@@ -261,10 +196,9 @@ class EventFinder:
             """Helper to run complete data pipeline"""
             print(f"\n[{datetime.now().strftime('%H:%M:%S')}] Running scheduled update...")
             self.run_scraper()
-            self.remove_duplicates()
-            self.clean_broken_urls()
-            self.validate_event_urls()
-            self.enhance_event_data()
+            # Local cleaning only; link checks run within a budget, most valuable first
+            self.run_cleaning_stage(check_links=False)
+            self.run_link_scheduler()
             self.run_ai_cleaner()
             print(f"[{datetime.now().strftime('%H:%M:%S')}] Update complete!")
         
@@ -314,9 +248,12 @@ Examples:
   python main.py                   # Full workflow (scrape → clean → enhance → validate → serve)
   python main.py --serve-only      # Start web server only
   python main.py --scrape-only     # Fetch new events
+  python main.py --scrape-only --concurrency 8  # Fetch up to 8 sources in parallel
   python main.py --clean-only      # Remove duplicates and broken links
+  python main.py --clean-only --full  # ...re-checking every link, not just new/stale ones
   python main.py --validate-only   # Run AI validation only
   python main.py --schedule 24     # Update every 24 hours, serve continuously
+  python main.py --schedule 24 --link-budget 120  # ...spending at most 2 min per run on link checks
         """
     )
     
@@ -340,6 +277,93 @@ Examples:
         action="store_true",
         help="Run only the web server"
     )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Number of sources to fetch in parallel while scraping (default: 1)"
+    )
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Parse pages in N worker processes while fetching continues "
+             "(0 = parse in the fetch threads, -1 = one per CPU core)"
+    )
+    parser.add_argument(
+        "--deep-crawl",
+        action="store_true",
+        help="Follow pagination on each source instead of reading only the first page"
+    )
+    parser.add_argument(
+        "--max-pages",
+        type=int,
+        metavar="N",
+        help="Deep crawl: maximum pages per source (default: per-source setting)"
+    )
+    parser.add_argument(
+        "--max-events",
+        type=int,
+        metavar="N",
+        help="Deep crawl: maximum events per source (default: per-source setting)"
+    )
+    parser.add_argument(
+        "--all-sources",
+        action="store_true",
+        help="Poll every source, ignoring per-source polling intervals and back-off"
+    )
+    parser.add_argument(
+        "--rescan-all",
+        action="store_true",
+        help="Parse every source even if its page is unchanged since the last run"
+    )
+    parser.add_argument(
+        "--no-http-cache",
+        action="store_true",
+        help="Always re-download pages instead of sending conditional requests"
+    )
+    parser.add_argument(
+        "--link-workers",
+        type=int,
+        default=8,
+        metavar="N",
+        help="Event links checked in parallel during cleaning (default: 8, max 2 per host)"
+    )
+    parser.add_argument(
+        "--link-budget",
+        type=float,
+        default=300.0,
+        metavar="SECONDS",
+        help="Scheduled mode: wall-clock budget for link checks per run (default: 300)"
+    )
+    parser.add_argument(
+        "--link-requests",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Scheduled mode: at most N network link checks per run"
+    )
+    parser.add_argument(
+        "--ai-workers",
+        type=int,
+        default=4,
+        metavar="N",
+        help="Concurrent AI validation requests (default: 4)"
+    )
+    parser.add_argument(
+        "--ai-rpm",
+        type=int,
+        default=60,
+        metavar="N",
+        help="Max AI validation requests per minute (default: 60)"
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Re-check every event link instead of only new, changed or stale ones"
+    )
     parser.add_argument(
         "--schedule",
         type=int,
@@ -351,6 +375,20 @@ Examples:
     
     # Create orchestrator
     finder = EventFinder()
+    finder.scrape_concurrency = max(1, args.concurrency)
+    finder.use_http_cache = not args.no_http_cache
+    finder.skip_unchanged_sources = not args.rescan_all
+    finder.poll_all_sources = args.all_sources
+    finder.deep_crawl = args.deep_crawl
+    finder.max_pages = args.max_pages
+    finder.max_events = args.max_events
+    finder.link_workers = max(1, args.link_workers)
+    finder.full_sweep = args.full
+    finder.link_budget_seconds = args.link_budget
+    finder.link_budget_requests = args.link_requests
+    finder.ai_workers = max(1, args.ai_workers)
+    finder.ai_rpm = max(1, args.ai_rpm)
+    finder.parse_workers = (os.cpu_count() or 1) if args.parse_workers < 0 else args.parse_workers
     
     # Check API key if needed
     if not args.serve_only and not args.clean_only and not finder.check_api_key():
@@ -363,10 +401,7 @@ Examples:
         elif args.scrape_only:
             finder.run_scraper()
         elif args.clean_only:
-            finder.remove_duplicates()
-            finder.clean_broken_urls()
-            finder.validate_event_urls()
-            finder.enhance_event_data()
+            finder.run_cleaning_stage()
             print("\n[OK] Cleaning pipeline completed!")
         elif args.validate_only:
             finder.run_ai_cleaner()
@@ -13,7 +13,14 @@ CREATE TABLE IF NOT EXISTS events (
     is_valid INTEGER DEFAULT 0,      -- 1 means AI-approved
     latitude REAL DEFAULT 51.5074,   -- London default
     longitude REAL DEFAULT -0.1278,  -- London default
-    created_at TEXT DEFAULT CURRENT_TIMESTAMP
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    link_checked_at TEXT,            -- when source_url was last validated
+    link_checked_url TEXT,           -- the source_url that was validated then
+    canonical_url TEXT,              -- dedupe key, see url_canonical.py
+    ai_state TEXT DEFAULT 'pending', -- pending / accepted / rejected / error / quarantined
+    ai_retries INTEGER DEFAULT 0,    -- failed AI attempts since the last verdict
+    ai_hash TEXT,                    -- content hash the AI state applies to
+    ai_verdict_source TEXT           -- 'model' or 'rules' (ai_prefilter.py)
 );
 
 -- Indexes for faster lookup
@@ -25,3 +32,70 @@ ON events(date);
 
 CREATE INDEX IF NOT EXISTS idx_events_is_valid
 ON events(is_valid);
+
+-- Normalized content fingerprint of each source listing page from the
+-- last successful scrape; unchanged pages are skipped entirely
+CREATE TABLE IF NOT EXISTS source_fingerprints (
+    source_url TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL,
+    updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Per-source crawl history used by the source scheduler
+CREATE TABLE IF NOT EXISTS source_stats (
+    source_name TEXT PRIMARY KEY,
+    runs INTEGER DEFAULT 0,
+    errors INTEGER DEFAULT 0,
+    events_found INTEGER DEFAULT 0,
+    events_inserted INTEGER DEFAULT 0,
+    consecutive_errors INTEGER DEFAULT 0,
+    consecutive_empty INTEGER DEFAULT 0,
+    avg_latency REAL,
+    last_polled_at TEXT,
+    next_poll_at TEXT
+);
+
+-- Cached URL check results shared by the link validation stages
+CREATE TABLE IF NOT EXISTS url_checks (
+    url TEXT PRIMARY KEY,
+    is_valid INTEGER NOT NULL,
+    final_url TEXT,
+    checked_at TEXT NOT NULL,
+    failure_count INTEGER DEFAULT 0,
+    expires_at TEXT NOT NULL
+);
+
+-- Per-host circuit breaker state shared by all outbound HTTP
+CREATE TABLE IF NOT EXISTS host_health (
+    host TEXT PRIMARY KEY,
+    state TEXT NOT NULL DEFAULT 'closed',
+    consecutive_failures INTEGER DEFAULT 0,
+    total_failures INTEGER DEFAULT 0,
+    total_successes INTEGER DEFAULT 0,
+    open_until TEXT,
+    last_failure_at TEXT,
+    last_success_at TEXT
+);
+
+-- Events the link-check scheduler ran out of budget for; they gain
+-- priority with every run they are deferred
+CREATE TABLE IF NOT EXISTS link_check_queue (
+    event_id INTEGER PRIMARY KEY,
+    priority REAL,
+    deferred_runs INTEGER DEFAULT 0,
+    queued_at TEXT
+);
+
+-- AI validation verdicts keyed by normalized content + model + prompt
+-- version, see ai_verdicts.py
+CREATE TABLE IF NOT EXISTS ai_verdicts (
+    content_hash TEXT PRIMARY KEY,
+    is_valid INTEGER NOT NULL,
+    confidence REAL,
+    cleaned_title TEXT,
+    category TEXT,
+    date TEXT,
+    model TEXT,
+    prompt_version TEXT,
+    created_at TEXT
+);
@@ -9,70 +9,324 @@ Run:
 
 Features:
     - Multiple source support (EventBrite, Meetup, Hackathons, Universities, etc.)
+    - Structured-data (JSON-LD / microdata) fast path before DOM heuristics
     - Smart HTML parsing with fallback selectors
-    - Rate limiting to respect websites
+    - Per-host rate limiting to respect websites
+    - Concurrent fetching across different hosts
+    - Conditional requests against an on-disk response cache
+    - Optional process pool for parsing, pipelined with fetching
+    - Skips sources whose listing page is unchanged since the last run
+    - Data-driven source registry (sources.json) with a yield-aware scheduler
+    - Opt-in deep crawl following pagination within a page/event budget
     - Proper user agents
     - Error handling and recovery
     - Progress tracking
 """
 
+import hashlib
+import queue
 import sqlite3
 import requests
 import time
 import random
+import threading
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+    wait,
+)
 from bs4 import BeautifulSoup
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, List, Dict, Tuple
+from typing import Optional, List, Dict, Iterator, Tuple
+from urllib.parse import parse_qsl, urlencode, urljoin, urlparse, urlunparse
 import re
 
+from db_schema import apply_schema
+from host_health import shared_breaker
+from http_cache import ResponseCache
+from http_transport import USER_AGENTS, shared_transport
+from source_registry import SourceConfig, SourceScheduler, load_sources
+from structured_data import extract_structured_events
+from url_canonical import canonical_url, listing_key
+
 DB_PATH = Path(__file__).parent / "database.db"
 
-# User agent list for rotation
-USER_AGENTS = [
-    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-    "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:89.0) Gecko/20100101 Firefox/89.0",
-    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.1.1 Safari/605.1.15",
-]
+# BeautifulSoup tree builder used by all parsers ("html.parser", "lxml", ...)
+HTML_PARSER = "html.parser"
+
+# Source registry (see sources.json / source_registry.py)
+EVENT_SOURCES: List[SourceConfig] = load_sources()
 
-EVENT_SOURCES = [
-    # General Event Platforms - Fast/Reliable
-    ("https://www.eventbrite.co.uk/d/united-kingdom--london/technology--events", "eventbrite"),
-    ("https://londontechweek.com", "ltw"),
-    ("https://www.feverup.com/london", "fever"),
-    
-    # Hackathons & Developer Events - Faster subset
-    ("https://devpost.com/hackathons?search=london", "devpost"),
-    ("https://mlh.io/seasons/2026/events", "mlh"),
-    ("https://www.hackerearth.com/challenges", "hackerearth"),
-    ("https://angelhack.com", "angelhack"),
-    ("https://itch.io/jams", "itch"),
-    ("https://www.kaggle.com/competitions", "kaggle"),
-    
-    # University Events (London) - Select few
-    ("https://www.imperial.ac.uk/events", "imperial"),
-    ("https://www.ucl.ac.uk/events", "ucl"),
-    
-    # Workshops & Communities - Reliable ones
-    ("https://generalassemb.ly/events", "ga"),
-    ("https://www.lewagon.com/events", "lewagon"),
-    ("https://codebar.io/events", "codebar"),
-    ("https://www.womenwhocode.com/london", "wwc"),
-    ("https://technation.io/events", "technation"),
-    ("https://www.startupgrind.com/london", "startupgrind"),
+
+# Page content that changes between requests without the listing changing:
+# non-structured scripts/styles, comments, CSRF tokens and nonces,
+# timestamps, and long opaque tokens (session ids, cache busters, hashes).
+VOLATILE_PATTERNS = [
+    re.compile(r"<script(?![^>]*ld\+json)[^>]*>.*?</script>", re.IGNORECASE | re.DOTALL),
+    re.compile(r"<style[^>]*>.*?</style>", re.IGNORECASE | re.DOTALL),
+    re.compile(r"<!--.*?-->", re.DOTALL),
+    re.compile(r"<(?:input|meta)[^>]*(?:csrf|token|nonce)[^>]*>", re.IGNORECASE),
+    re.compile(r"\b(?:nonce|integrity|data-reactid|data-csrf)=\"[^\"]*\"", re.IGNORECASE),
+    re.compile(r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}(?::\d{2})?(?:\.\d+)?(?:Z|[+-]\d{2}:?\d{2})?"),
+    re.compile(r"\b\d{1,2}:\d{2}:\d{2}\b"),
+    re.compile(r"\b1\d{9}(?:\d{3})?\b"),
+    re.compile(r"[A-Za-z0-9_\-]{32,}"),
 ]
+WHITESPACE = re.compile(r"\s+")
+
+
+def page_fingerprint(html: str) -> str:
+    """Hash of the page with volatile tokens stripped and whitespace collapsed."""
+    for pattern in VOLATILE_PATTERNS:
+        html = pattern.sub("", html)
+    html = WHITESPACE.sub(" ", html).strip()
+    return hashlib.sha256(html.encode("utf-8", "replace")).hexdigest()
+
+
+# Pagination links: rel="next", or anchors labelled "Next" / arrows
+NEXT_REL_LINK = re.compile(
+    r"<(?:a|link)\b(?=[^>]*\brel=[\"']?next\b)[^>]*\bhref=[\"']([^\"']+)[\"']", re.IGNORECASE
+)
+NEXT_LABELLED_LINK = re.compile(
+    r"<a\b[^>]*\bhref=[\"']([^\"']+)[\"'][^>]*>\s*(?:<[^>]+>\s*)*"
+    r"(?:next(?:\s+page)?|more events|&raquo;|&rsaquo;|»|›)\s*<",
+    re.IGNORECASE,
+)
+NEXT_ARIA_LINK = re.compile(
+    r"<a\b(?=[^>]*\baria-label=[\"'][^\"']*next[^\"']*[\"'])[^>]*\bhref=[\"']([^\"']+)[\"']",
+    re.IGNORECASE,
+)
+
+
+def find_next_page(html: str, page_url: str, page_param: Optional[str] = None) -> Optional[str]:
+    """
+    Find the URL of the next listing page.
+    
+    Looks for rel="next" and "Next"-style links in the raw HTML; when there
+    are none and the source declares a page query parameter, the parameter
+    is incremented instead.
+    """
+    for pattern in (NEXT_REL_LINK, NEXT_ARIA_LINK, NEXT_LABELLED_LINK):
+        match = pattern.search(html)
+        if match:
+            href = match.group(1).replace("&amp;", "&")
+            if not href.startswith(("#", "javascript:")):
+                return urljoin(page_url, href)
+    
+    if page_param:
+        parts = urlparse(page_url)
+        query = dict(parse_qsl(parts.query))
+        try:
+            page = int(query.get(page_param, 1))
+        except ValueError:
+            return None
+        query[page_param] = str(page + 1)
+        return urlunparse(parts._replace(query=urlencode(query)))
+    return None
+
+
+class HostRateLimiter:
+    """
+    Hands out request slots so that requests to the same host are spaced
+    at least `min_interval` seconds apart, while different hosts proceed
+    independently. Safe to share between threads.
+    """
+    
+    def __init__(self, min_interval: float = 0.5):
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._next_slot: Dict[str, float] = {}
+    
+    def wait(self, url: str, min_interval: Optional[float] = None):
+        """Block until the host of `url` may be contacted again."""
+        interval = self.min_interval if min_interval is None else min_interval
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class ListingSpec:
+    """
+    Declarative description of an event listing page, compiled once and
+    evaluated in a single walk over the parsed document.
+    
+    Args:
+        containers: (tag, class regex or None) pairs marking an event card.
+            A container directly holding two or more alike containers (same
+            tag and class) is a list, and those are the cards; otherwise the
+            outermost container is the card and everything inside it,
+            nested containers included, belongs to it.
+        title_tags: Tags whose first occurrence inside a card gives the title.
+        date_tags: Tags that may hold the date, filtered by `date_class`.
+        date_class: Class regex a date tag must match.
+        link_keywords: Keywords for the link fallback used when no card matches.
+        limit: Maximum number of cards read per page.
+        link_limit: Number of leading links inspected by the fallback.
+    
+    A wrapper matching a container does not swallow the cards inside it:
+    
+        >>> html = '<div class="events-list">' + '<li class="event"><h3>Talk</h3></li>' * 8 + '</div>'
+        >>> cards, _ = GENERIC_LISTING.extract(BeautifulSoup(html, "html.parser"))
+        >>> len(cards)
+        8
+    
+    and a card keeps its content when a part of it matches a container too:
+    
+        >>> card = ('<div class="event-card"><div class="event-image"><img></div>'
+        ...         '<h3><a href="/e/1">Talk</a></h3><span class="date">1 May</span></div>')
+        >>> cards, _ = GENERIC_LISTING.extract(BeautifulSoup(card * 6, "html.parser"))
+        >>> len(cards), cards[0]["title"].get_text(), cards[0]["link"]["href"], cards[0]["date"].get_text()
+        (6, 'Talk', '/e/1', '1 May')
+    """
+    
+    def __init__(self, containers, title_tags, date_tags, date_class,
+                 link_keywords, limit: int = 15, link_limit: int = 10):
+        self.containers: Dict[str, Optional[re.Pattern]] = {}
+        for tag, class_pattern in containers:
+            self.containers[tag] = re.compile(class_pattern) if class_pattern else None
+        self.title_tags = frozenset(title_tags)
+        self.date_tags = frozenset(date_tags)
+        self.date_class = re.compile(date_class)
+        self.link_keywords = re.compile("|".join(map(re.escape, link_keywords)), re.IGNORECASE)
+        self.limit = limit
+        self.link_limit = link_limit
+    
+    @staticmethod
+    def _class_matches(tag, pattern: re.Pattern) -> bool:
+        return any(pattern.search(c) for c in tag.get("class") or ())
+    
+    def is_container(self, tag) -> bool:
+        if tag.name not in self.containers:
+            return False
+        pattern = self.containers[tag.name]
+        return pattern is None or self._class_matches(tag, pattern)
+    
+    def is_list(self, tag) -> bool:
+        """True if `tag` directly holds two or more alike containers (the cards)."""
+        seen = set()
+        for child in tag.children:
+            if hasattr(child, "contents") and self.is_container(child):
+                kind = (child.name, tuple(child.get("class") or ()))
+                if kind in seen:
+                    return True
+                seen.add(kind)
+        return False
+    
+    def extract(self, soup, limit: Optional[int] = None) -> Tuple[List[Dict], List]:
+        """
+        Walk the document once, reading at most `limit` cards (default: the spec's limit).
+        
+        Returns:
+            (cards, links): one dict per card with the title/link/date
+            elements found inside it, and the first `link_limit` anchors
+            with an href (only needed when no card matched).
+        """
+        limit = self.limit if limit is None else limit
+        cards: List[Dict] = []
+        links = []
+        stack = [(child, None) for child in reversed(soup.contents)]
+        while stack:
+            node, card = stack.pop()
+            if not hasattr(node, "contents"):
+                continue  # text node
+            
+            if card is None:
+                if len(cards) >= limit:
+                    break  # all cards read and we are outside of them
+                if self.is_container(node) and not self.is_list(node):
+                    card = {"title": None, "link": None, "date": None}
+                    cards.append(card)
+                elif node.name == "a" and node.get("href") and len(links) < self.link_limit:
+                    links.append(node)
+            else:
+                if card["title"] is None and node.name in self.title_tags:
+                    card["title"] = node
+                if card["link"] is None and node.name == "a" and node.get("href"):
+                    card["link"] = node
+                if (card["date"] is None and node.name in self.date_tags
+                        and self._class_matches(node, self.date_class)):
+                    card["date"] = node
+            
+            stack.extend((child, card) for child in reversed(node.contents))
+        return cards, links
+
+
+GENERIC_SELECTORS = dict(
+    containers=[
+        ("article", None),
+        ("div", "event|Event"),
+        ("li", "event|Event"),
+    ],
+    title_tags=["h2", "h3", "a"],
+    date_tags=["time", "span"],
+    date_class="date|time",
+    link_keywords=["event", "workshop", "meetup", "talk", "conference", "summit"],
+)
+GENERIC_LISTING = ListingSpec(**GENERIC_SELECTORS)
+
+# Display names of the sources with a dedicated parser
+PARSER_DISPLAY_NAMES = {"eventbrite": "EventBrite", "meetup": "Meetup", "devpost": "DevPost"}
+
+# Compiled specs for sources with their own selectors or item limit
+_listing_specs: Dict[str, ListingSpec] = {}
+
+
+def listing_spec(source: SourceConfig) -> ListingSpec:
+    """Return the compiled listing spec for a source (selectors from the registry)."""
+    if not source.selectors and source.item_limit == GENERIC_LISTING.limit:
+        return GENERIC_LISTING
+    if source.name not in _listing_specs:
+        options = {**GENERIC_SELECTORS, **(source.selectors or {}), "limit": source.item_limit}
+        _listing_specs[source.name] = ListingSpec(**options)
+    return _listing_specs[source.name]
 
 
 class EventScraper:
     """Handles scraping from multiple sources with intelligent parsing."""
     
-    def __init__(self):
-        self.session = requests.Session()
+    def __init__(self, use_cache: bool = True, skip_unchanged: bool = True, parse_only: bool = False):
+        """
+        `parse_only` builds a scraper that only parses pages (the process-pool
+        workers): no transport, circuit breaker or response cache, so it
+        neither opens the database nor applies the schema.
+        """
+        self.session = None if parse_only else shared_transport()
+        self.rate_limiter = None if parse_only else HostRateLimiter()
+        self.breaker = None if parse_only else shared_breaker()
+        self.cache = ResponseCache() if use_cache and not parse_only else None
+        self.skip_unchanged = skip_unchanged
+        self.fingerprints: Dict[str, str] = {}
+        self.new_fingerprints: Dict[str, str] = {}
+        self.scheduler: Optional[SourceScheduler] = None
+        self.fetch_results: Dict[str, Tuple[float, bool]] = {}
+        self._stats_lock = threading.Lock()
         self.events_found = 0
         self.events_inserted = 0
+        self.events_skipped = 0
         self.errors = 0
+        self.circuit_skips = 0
+        self.sources_unchanged = 0
+        self.sources_deferred = 0
+        self.parse_seconds = 0.0
+        self.structured_sources = 0
+        self.dom_sources = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.cache_not_modified = 0
+        self.cache_bytes_saved = 0
+        # Dedicated parsers by SourceConfig.parser; anything else uses parse_generic_html
+        self.parsers = {
+            "eventbrite": self.parse_eventbrite,
+            "meetup": self.parse_meetup,
+            "devpost": self.parse_devpost,
+        }
         
     def get_random_user_agent(self) -> str:
         """Return a random user agent."""
@@ -82,34 +336,105 @@ class EventScraper:
         """
         Safely fetch URL with user agent rotation, error handling, and rate limiting.
         
+        When the response cache is enabled, stored validators are sent as
+        If-None-Match / If-Modified-Since and a 304 is answered from the cache.
+        Hosts whose circuit is open are skipped without a request.
+        
         Args:
             url: URL to fetch
             timeout: Request timeout in seconds
-            delay: Delay between requests in seconds
+            delay: Minimum delay between requests to the same host in seconds
             
         Returns:
             HTML content or None if failed
         """
+        if not self.breaker.allow(url):
+            print(f"  🔌 Skipping {url}: host circuit open")
+            self.add_stats(circuit_skips=1)
+            return None
+        
         try:
-            time.sleep(delay)  # Rate limiting
+            self.rate_limiter.wait(url, delay)  # Per-host rate limiting
             headers = {"User-Agent": self.get_random_user_agent()}
+            cached = self.cache.get(url) if self.cache else None
+            if self.cache:
+                headers.update(self.cache.conditional_headers(cached))
+                self.add_stats(**{"cache_hits" if cached else "cache_misses": 1})
+            
             response = self.session.get(url, headers=headers, timeout=timeout)
+            self.breaker.record_response(url, response.status_code)
+            if response.status_code == 304 and cached:
+                self.cache.touch(url)
+                self.add_stats(cache_not_modified=1, cache_bytes_saved=len(cached["body"]))
+                return cached["body"]
+            
             response.raise_for_status()
+            if self.cache:
+                self.cache.store(
+                    url,
+                    response.text,
+                    response.headers.get("ETag"),
+                    response.headers.get("Last-Modified"),
+                )
             return response.text
         except requests.RequestException as e:
+            if isinstance(e, (requests.Timeout, requests.ConnectionError)):
+                self.breaker.record_failure(url)
             print(f"  ❌ Failed to fetch {url}: {str(e)[:80]}")
-            self.errors += 1
+            self.add_stats(errors=1)
             return None
     
+    def add_stats(self, **counts: int):
+        """Increment run counters; safe to call from fetch worker threads."""
+        with self._stats_lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+    
     def init_db(self):
         """Ensure the database and schema exist."""
         conn = sqlite3.connect(DB_PATH)
-        cur = conn.cursor()
-        with open(Path(__file__).parent / "schema.sql", "r", encoding="utf-8") as f:
-            cur.executescript(f.read())
-        conn.commit()
+        apply_schema(conn)
         return conn
     
+    def load_fingerprints(self, conn):
+        """Load the page fingerprints stored by previous successful runs."""
+        rows = conn.execute("SELECT source_url, fingerprint FROM source_fingerprints").fetchall()
+        self.fingerprints = dict(rows)
+    
+    def page_unchanged(self, url: str, html: str) -> bool:
+        """
+        Compare the page against its stored fingerprint.
+        
+        The new fingerprint is remembered and only persisted by
+        save_fingerprint once the source has been ingested successfully.
+        """
+        if not self.skip_unchanged:
+            return False
+        fingerprint = page_fingerprint(html)
+        if self.fingerprints.get(url) == fingerprint:
+            self.add_stats(sources_unchanged=1)
+            return True
+        self.new_fingerprints[url] = fingerprint
+        return False
+    
+    def save_fingerprint(self, conn, url: str):
+        """Persist the fingerprint of a successfully ingested source page."""
+        fingerprint = self.new_fingerprints.pop(url, None)
+        if fingerprint is None:
+            return
+        with conn:
+            conn.execute(
+                """
+                INSERT INTO source_fingerprints (source_url, fingerprint, updated_at)
+                VALUES (?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT(source_url) DO UPDATE SET
+                    fingerprint = excluded.fingerprint,
+                    updated_at = excluded.updated_at
+                """,
+                (url, fingerprint),
+            )
+        self.fingerprints[url] = fingerprint
+    
     def event_exists(self, conn, source_id: str) -> bool:
         """Check if an event with this source_id already exists."""
         try:
@@ -122,53 +447,82 @@ class EventScraper:
     def insert_event(self, conn, event: Dict) -> bool:
         """Insert a single event into the database."""
         try:
-            if self.event_exists(conn, event["source_id"]):
-                return False
-            
-            cur = conn.cursor()
-            cur.execute(
+            inserted, _ = self.insert_events(conn, [event])
+        except Exception as e:
+            print(f"  ⚠️  Failed to insert event: {str(e)[:60]}")
+            return False
+        return inserted == 1
+    
+    def insert_events(self, conn, events: List[Dict]) -> Tuple[int, int]:
+        """
+        Insert a batch of events in a single transaction.
+        
+        Rows whose source_id already exists are skipped by the unique
+        idx_events_source_id index (INSERT OR IGNORE), and rows whose
+        canonical URL is already stored (under another link variant) are
+        skipped through the idx_events_canonical_url index, so no per-row
+        existence check or commit is needed. An event's own "canonical_url"
+        (a listing key set by parse_page) takes precedence over its URL's.
+        
+        Returns:
+            (inserted, skipped)
+        
+        Raises:
+            sqlite3.Error if the batch could not be written (nothing is stored).
+        """
+        if not events:
+            return 0, 0
+        
+        rows = []
+        for event in events:
+            canonical = event.get("canonical_url") or canonical_url(event["url"])
+            rows.append((
+                event["source_id"],
+                event["title"],
+                event.get("date"),
+                event.get("location", "London"),
+                event.get("category"),
+                event.get("is_free", 0),
+                event["source"],
+                event["url"],
+                None,
+                0,
+                canonical,
+                canonical,  # NOT EXISTS parameter
+            ))
+        before = conn.total_changes
+        with conn:
+            conn.executemany(
                 """
-                INSERT INTO events (
+                INSERT OR IGNORE INTO events (
                     source_id, title, date, location, category,
                     is_free, source_name, source_url,
-                    confidence_score, is_valid
+                    confidence_score, is_valid, canonical_url
                 )
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                SELECT ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?
+                WHERE NOT EXISTS (SELECT 1 FROM events WHERE canonical_url = ?)
                 """,
-                (
-                    event["source_id"],
-                    event["title"],
-                    event.get("date"),
-                    event.get("location", "London"),
-                    event.get("category"),
-                    event.get("is_free", 0),
-                    event["source"],
-                    event["url"],
-                    None,
-                    0,
-                ),
+                rows,
             )
-            conn.commit()
-            self.events_inserted += 1
-            return True
-        except Exception as e:
-            print(f"  ⚠️  Failed to insert event: {str(e)[:60]}")
-            return False
+        inserted = conn.total_changes - before
+        
+        self.add_stats(events_inserted=inserted, events_skipped=len(rows) - inserted)
+        return inserted, len(rows) - inserted
     
     # ===== PARSER FUNCTIONS FOR DIFFERENT SOURCES =====
     
-    def parse_eventbrite(self, html: str, source_url: str) -> List[Dict]:
+    def parse_eventbrite(self, html: str, source_url: str, limit: int = 15) -> List[Dict]:
         """Parse EventBrite London tech events."""
         events = []
         try:
-            soup = BeautifulSoup(html, "html.parser")
+            soup = BeautifulSoup(html, HTML_PARSER)
             
             # EventBrite event cards
             cards = soup.find_all("article", attrs={"data-event-id": True})
             if not cards:
                 cards = soup.find_all("div", class_=re.compile("EventCard"))
             
-            for card in cards[:15]:  # Limit to 15 per source
+            for card in cards[:limit]:
                 try:
                     # Title
                     title_el = card.find(["h2", "h3"])
@@ -218,18 +572,18 @@ class EventScraper:
         
         return events
     
-    def parse_meetup(self, html: str, source_url: str) -> List[Dict]:
+    def parse_meetup(self, html: str, source_url: str, limit: int = 15) -> List[Dict]:
         """Parse Meetup events."""
         events = []
         try:
-            soup = BeautifulSoup(html, "html.parser")
+            soup = BeautifulSoup(html, HTML_PARSER)
             
             # Meetup event listings
             event_els = soup.find_all("a", {"class": re.compile("eventCardHead")})
             if not event_els:
                 event_els = soup.find_all("div", {"class": re.compile("eventCard")})
             
-            for el in event_els[:15]:
+            for el in event_els[:limit]:
                 try:
                     title = el.get_text(strip=True) if el else None
                     if not title or len(title) < 3:
@@ -258,18 +612,18 @@ class EventScraper:
         
         return events
     
-    def parse_devpost(self, html: str, source_url: str) -> List[Dict]:
+    def parse_devpost(self, html: str, source_url: str, limit: int = 15) -> List[Dict]:
         """Parse DevPost hackathons."""
         events = []
         try:
-            soup = BeautifulSoup(html, "html.parser")
+            soup = BeautifulSoup(html, HTML_PARSER)
             
             # DevPost hackathon entries
             hackathons = soup.find_all("a", {"class": re.compile("hackathon-card")})
             if not hackathons:
                 hackathons = soup.find_all("div", {"class": re.compile("hackathon")})
             
-            for hack in hackathons[:15]:
+            for hack in hackathons[:limit]:
                 try:
                     title_el = hack.find("h2") or hack.find("a")
                     title = title_el.get_text(strip=True) if title_el else None
@@ -298,29 +652,19 @@ class EventScraper:
         
         return events
     
-    def parse_generic_html(self, html: str, source_url: str, source_name: str) -> List[Dict]:
-        """Generic HTML parser for sites with event listings."""
+    def parse_generic_html(self, html: str, source_url: str, source_name: str,
+                           spec: ListingSpec = GENERIC_LISTING, limit: Optional[int] = None) -> List[Dict]:
+        """Generic HTML parser for sites with event listings (see GENERIC_LISTING)."""
         events = []
         try:
-            soup = BeautifulSoup(html, "html.parser")
-            
-            # Common event selectors
-            selectors = [
-                ("article", {}),
-                ("div", {"class": re.compile("event|Event")}),
-                ("li", {"class": re.compile("event|Event")}),
-            ]
+            soup = BeautifulSoup(html, HTML_PARSER)
+            cards, links = spec.extract(soup, limit)
             
-            found_elements = []
-            for tag, attrs in selectors:
-                found_elements.extend(soup.find_all(tag, attrs, limit=20))
-            
-            if not found_elements:
+            if not cards:
                 # Fallback: look for any links with event keywords
-                all_links = soup.find_all("a", href=True)
-                for link in all_links[:10]:
+                for link in links:
                     text = link.get_text(strip=True)
-                    if any(keyword in text.lower() for keyword in ["event", "workshop", "meetup", "talk", "conference", "summit"]):
+                    if spec.link_keywords.search(text):
                         events.append({
                             "source_id": f"{source_name}_{text}".replace(" ", "_")[:50],
                             "title": text[:150],
@@ -333,105 +677,344 @@ class EventScraper:
                         })
                 return events
             
-            for element in found_elements[:15]:
-                try:
-                    # Try to extract title
-                    title_el = element.find(["h2", "h3", "a"])
-                    title = title_el.get_text(strip=True) if title_el else None
-                    
-                    if not title or len(title) < 3:
-                        continue
-                    
-                    # Try to extract URL
-                    link = element.find("a", href=True)
-                    url = link["href"] if link else source_url
-                    
-                    # Try to extract date (common patterns)
-                    date_el = element.find(["time", "span"], class_=re.compile("date|time"))
-                    date_text = date_el.get_text(strip=True) if date_el else None
-                    
-                    source_id = f"{source_name}_{title}".replace(" ", "_")[:50]
-                    
-                    events.append({
-                        "source_id": source_id,
-                        "title": title[:150],
-                        "date": date_text,
-                        "location": "London",
-                        "is_free": 0,
-                        "source": source_name,
-                        "url": url,
-                        "category": "tech",
-                    })
-                except Exception as e:
+            for card in cards:
+                title = card["title"].get_text(strip=True) if card["title"] else None
+                if not title or len(title) < 3:
                     continue
+                
+                url = card["link"]["href"] if card["link"] else source_url
+                date_text = card["date"].get_text(strip=True) if card["date"] else None
+                
+                events.append({
+                    "source_id": f"{source_name}_{title}".replace(" ", "_")[:50],
+                    "title": title[:150],
+                    "date": date_text,
+                    "location": "London",
+                    "is_free": 0,
+                    "source": source_name,
+                    "url": url,
+                    "category": "tech",
+                })
         except Exception as e:
             print(f"    Error in generic parser: {str(e)[:60]}")
         
         return events
     
-    def scrape_source(self, url: str, source_type: str) -> List[Dict]:
-        """Scrape a single source and extract events."""
-        print(f"📍 Scraping {source_type}...")
+    def parse_page(self, html: str, source: SourceConfig, page_url: Optional[str] = None,
+                   limit: Optional[int] = None) -> Tuple[List[Dict], float, str]:
+        """
+        Extract events from fetched HTML.
+        
+        Embedded schema.org Event data (JSON-LD / microdata) is tried first;
+        the parser configured for the source only runs when there is none.
+        `page_url` is the listing page the HTML came from (defaults to the
+        source URL) and is used as the fallback event URL; events that only
+        have that URL get a listing key as canonical_url, so they are not
+        deduplicated against the other cards of the page. `limit` overrides
+        the source's item_limit (deep crawls pass their remaining event budget).
+        
+        Returns:
+            (events, parse_seconds, path) where path is "structured" or "dom"
+        """
+        source_name = PARSER_DISPLAY_NAMES.get(source.parser, source.name.title())
+        page_url = page_url or source.url
+        limit = source.item_limit if limit is None else limit
         
-        html = self.safe_fetch(url)
+        started = time.perf_counter()
+        path = "structured"
+        events = extract_structured_events(html, page_url, source.name, source_name, limit)
+        if not events:
+            path = "dom"
+            if source.parser in self.parsers:
+                events = self.parsers[source.parser](html, page_url, limit)
+            else:
+                events = self.parse_generic_html(html, page_url, source_name, listing_spec(source), limit)
+        
+        page = canonical_url(page_url)
+        for event in events:
+            if canonical_url(event.get("url")) == page:
+                event["canonical_url"] = listing_key(page_url, event.get("title"))
+        return events, time.perf_counter() - started, path
+    
+    def fetch_source(self, source: SourceConfig) -> Optional[str]:
+        """Fetch a source page, remembering its latency and outcome for the scheduler."""
+        print(f"📍 Scraping {source.name}...")
+        started = time.perf_counter()
+        html = self.safe_fetch(source.url, timeout=source.timeout)
+        self.fetch_results[source.name] = (time.perf_counter() - started, html is None)
+        return html
+    
+    def scrape_source(self, source: SourceConfig) -> List[Dict]:
+        """Scrape a single source and extract events."""
+        html = self.fetch_source(source)
         if not html:
             return []
+        if self.page_unchanged(source.url, html):
+            print(f"  ⏭️  {source.name} unchanged since last run - skipping")
+            return []
         
-        # Route to appropriate parser
-        parsers = {
-            "eventbrite": self.parse_eventbrite,
-            "meetup": self.parse_meetup,
-            "devpost": self.parse_devpost,
-        }
+        events, parse_time, path = self.parse_page(html, source)
+        return self.record_parsed(source.name, events, parse_time, path)
+    
+    def record_parsed(self, source_name: str, events: List[Dict], parse_time: float,
+                      path: str = "dom") -> List[Dict]:
+        """Count and report the events parsed from one source."""
+        self.add_stats(events_found=len(events), parse_seconds=parse_time,
+                       **{f"{path}_sources": 1})
+        print(f"  ✓ Found {len(events)} events from {source_name} via {path} data "
+              f"(parsed in {parse_time * 1000:.0f} ms)")
+        return events
+    
+    def finish_source(self, conn, source: SourceConfig, events: List[Dict]):
+        """Store a source's events and record the run in its crawl history."""
+        inserted, _ = self.insert_events(conn, events)
+        self.save_fingerprint(conn, source.url)
+        latency, failed = self.fetch_results.get(source.name, (None, False))
+        self.scheduler.record(source, found=len(events), inserted=inserted,
+                              latency=latency, failed=failed)
+    
+    def fail_source(self, source: SourceConfig, error: Exception):
+        """Report a source that raised and record the failure in its crawl history."""
+        print(f"  ❌ Error with {source.name}: {str(error)[:60]}")
+        self.add_stats(errors=1)
+        latency, _ = self.fetch_results.get(source.name, (None, True))
+        self.scheduler.record(source, latency=latency, failed=True)
+    
+    def scrape_pipelined(self, conn, sources: List[SourceConfig], concurrency: int, parse_workers: int):
+        """
+        Fetch on a thread pool and parse on a process pool at the same time.
         
-        parser = parsers.get(source_type, self.parse_generic_html)
+        Each completed fetch is immediately submitted to a parser process and
+        each completed parse is immediately written to the database, so the
+        network, the parser processes and the DB writer all stay busy.
+        """
+        with ThreadPoolExecutor(max_workers=concurrency) as fetchers, \
+                ProcessPoolExecutor(max_workers=parse_workers) as parsers:
+            pending = {
+                fetchers.submit(self.fetch_source, source): ("fetch", source)
+                for source in sources
+            }
+            
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage, source = pending.pop(future)
+                    try:
+                        if stage == "fetch":
+                            html = future.result()
+                            if not html:
+                                self.finish_source(conn, source, [])
+                            elif self.page_unchanged(source.url, html):
+                                print(f"  ⏭️  {source.name} unchanged since last run - skipping")
+                                self.finish_source(conn, source, [])
+                            else:
+                                job = parsers.submit(parse_page_in_worker, html, source)
+                                pending[job] = ("parse", source)
+                        else:
+                            events, parse_time, path = future.result()
+                            self.record_parsed(source.name, events, parse_time, path)
+                            self.finish_source(conn, source, events)
+                    except Exception as e:
+                        self.fail_source(source, e)
+    
+    def iter_source_pages(self, source: SourceConfig, max_pages: int,
+                          max_events: int) -> Iterator[Tuple[str, List[Dict]]]:
+        """
+        Follow a source's pagination, yielding (page_url, events) per page.
         
-        if source_type in parsers:
-            events = parser(html, url)
-        else:
-            events = self.parse_generic_html(html, url, source_type.title())
+        Only one page is held in memory at a time. Stops when the page or
+        event budget is spent, a page fails or has no events, or there is
+        no further page.
+        """
+        url = source.url
+        visited = set()
+        yielded = 0
+        for page_no in range(1, max_pages + 1):
+            visited.add(url)
+            if page_no == 1:
+                html = self.fetch_source(source)
+            else:
+                html = self.safe_fetch(url, timeout=source.timeout)
+            if not html:
+                return
+            
+            if self.page_unchanged(url, html):
+                print(f"  ⏭️  {source.name} page {page_no} unchanged since last run - skipping")
+                yield url, []
+            else:
+                # No per-page item cap: only the page and event budgets apply
+                events, parse_time, path = self.parse_page(html, source, page_url=url,
+                                                           limit=max_events - yielded)
+                yielded += len(events)
+                yield url, self.record_parsed(f"{source.name} (page {page_no})", events, parse_time, path)
+                if not events:
+                    return  # ran past the end of the listing
+            
+            if yielded >= max_events:
+                return
+            next_url = find_next_page(html, url, source.page_param)
+            if not next_url or next_url in visited:
+                return
+            url = next_url
+    
+    def scrape_deep(self, conn, sources: List[SourceConfig], concurrency: int,
+                    max_pages: Optional[int], max_events: Optional[int]):
+        """
+        Deep-crawl sources, streaming each page's events into the database.
         
-        self.events_found += len(events)
-        print(f"  ✓ Found {len(events)} events")
-        return events
+        Crawler threads push one page batch at a time through a bounded
+        queue to this thread, which is the only DB writer, so memory stays
+        flat regardless of how many pages are crawled.
+        """
+        pages: "queue.Queue" = queue.Queue(maxsize=concurrency * 2)
+        done = object()
+        
+        def crawl(source: SourceConfig):
+            try:
+                for page_url, events in self.iter_source_pages(
+                    source,
+                    max_pages or source.max_pages,
+                    max_events or source.max_events,
+                ):
+                    pages.put((source, page_url, events))
+                pages.put((source, None, done))
+            except Exception as e:
+                pages.put((source, None, e))
+        
+        totals = {source.name: [0, 0] for source in sources}
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for source in sources:
+                pool.submit(crawl, source)
+            
+            remaining = len(sources)
+            while remaining:
+                source, page_url, events = pages.get()
+                if events is done or isinstance(events, Exception):
+                    remaining -= 1
+                    if events is done:
+                        found, inserted = totals[source.name]
+                        latency, failed = self.fetch_results.get(source.name, (None, False))
+                        self.scheduler.record(source, found=found, inserted=inserted,
+                                              latency=latency, failed=failed)
+                    else:
+                        self.fail_source(source, events)
+                    continue
+                try:
+                    inserted, _ = self.insert_events(conn, events)
+                    self.save_fingerprint(conn, page_url)
+                    totals[source.name][0] += len(events)
+                    totals[source.name][1] += inserted
+                except Exception as e:
+                    print(f"  ❌ Error storing {page_url}: {str(e)[:60]}")
+                    self.add_stats(errors=1)
     
-    def scrape_all_sources(self) -> int:
-        """Scrape all configured sources."""
+    def scrape_all_sources(self, concurrency: int = 1, parse_workers: int = 0,
+                           poll_all: bool = False, deep_crawl: bool = False,
+                           max_pages: Optional[int] = None,
+                           max_events: Optional[int] = None) -> int:
+        """
+        Scrape all sources that are due according to the source scheduler.
+        
+        Args:
+            concurrency: Number of sources fetched and parsed in parallel.
+                Requests to the same host are still spaced out by the
+                per-host rate limiter; database writes stay on this thread.
+            parse_workers: When > 0, fetching and parsing are pipelined:
+                fetched HTML is handed to a pool of this many parser
+                processes while further fetches continue.
+            poll_all: Ignore polling intervals and back-off and poll every source.
+            deep_crawl: Follow pagination on every source, streaming events
+                page by page into the database.
+            max_pages, max_events: Per-source deep-crawl budget; defaults to
+                the values in the source registry.
+        """
         conn = self.init_db()
+        transport_mark = shared_transport().snapshot()
+        self.load_fingerprints(conn)
+        self.scheduler = SourceScheduler(conn)
+        sources = self.scheduler.due_sources(EVENT_SOURCES, poll_all=poll_all)
+        self.sources_deferred = len(EVENT_SOURCES) - len(sources)
         
         print("\n" + "="*60)
         print("🚀 LONDON TECH EVENTS SCRAPER - MULTI-SOURCE")
         print("="*60 + "\n")
+        print(f"🗓️  {len(sources)} of {len(EVENT_SOURCES)} sources due for polling\n")
         
-        for url, source_type in EVENT_SOURCES:
-            try:
-                events = self.scrape_source(url, source_type)
-                
-                for event in events:
-                    self.insert_event(conn, event)
-                
-            except Exception as e:
-                print(f"  ❌ Error with {source_type}: {str(e)[:60]}")
-                self.errors += 1
+        if deep_crawl:
+            print(f"🔎 Deep crawl with {max(1, concurrency)} workers\n")
+            self.scrape_deep(conn, sources, max(1, concurrency), max_pages, max_events)
+        elif parse_workers > 0:
+            print(f"⚡ Fetching with {max(1, concurrency)} workers, "
+                  f"parsing with {parse_workers} processes\n")
+            self.scrape_pipelined(conn, sources, max(1, concurrency), parse_workers)
+        elif concurrency <= 1:
+            for source in sources:
+                try:
+                    events = self.scrape_source(source)
+                    self.finish_source(conn, source, events)
+                    
+                except Exception as e:
+                    self.fail_source(source, e)
+        else:
+            print(f"⚡ Fetching with {concurrency} concurrent workers\n")
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                futures = {pool.submit(self.scrape_source, source): source for source in sources}
+                for future in as_completed(futures):
+                    source = futures[future]
+                    try:
+                        self.finish_source(conn, source, future.result())
+                    except Exception as e:
+                        self.fail_source(source, e)
         
         conn.close()
+        self.breaker.flush()
+        if self.cache:
+            self.cache.prune()
         
         print("\n" + "="*60)
         print("✅ SCRAPING COMPLETE")
         print("="*60)
         print(f"Total events found:   {self.events_found}")
         print(f"Events inserted:      {self.events_inserted}")
+        print(f"Already stored:       {self.events_skipped}")
         print(f"Errors encountered:   {self.errors}")
+        print(f"Circuit-open skips:   {self.circuit_skips}")
+        print(f"Unchanged (skipped):  {self.sources_unchanged}")
+        print(f"Not due (deferred):   {self.sources_deferred}")
+        print(f"Time spent parsing:   {self.parse_seconds:.2f}s")
+        print(f"Parsed via JSON-LD / DOM: {self.structured_sources} / {self.dom_sources}")
+        if self.cache:
+            print(f"Cache hits / misses:  {self.cache_hits} / {self.cache_misses}")
+            print(f"Not modified (304):   {self.cache_not_modified} "
+                  f"({self.cache_bytes_saved / 1024:.0f} KB saved)")
+        shared_transport().report(since=transport_mark)
         print("="*60 + "\n")
         
         return self.events_inserted
 
 
-def scrape_london_tech_events():
+# Parser instance owned by each worker process of the pipelined mode
+_worker_scraper: Optional[EventScraper] = None
+
+
+def parse_page_in_worker(html: str, source: SourceConfig) -> Tuple[List[Dict], float, str]:
+    """Process-pool entry point: parse one fetched page."""
+    global _worker_scraper
+    if _worker_scraper is None:
+        _worker_scraper = EventScraper(parse_only=True)
+    return _worker_scraper.parse_page(html, source)
+
+
+def scrape_london_tech_events(concurrency: int = 1, use_cache: bool = True, parse_workers: int = 0,
+                              skip_unchanged: bool = True, poll_all: bool = False,
+                              deep_crawl: bool = False, max_pages: Optional[int] = None,
+                              max_events: Optional[int] = None):
     """Main entry point."""
     try:
-        scraper = EventScraper()
-        scraper.scrape_all_sources()
+        scraper = EventScraper(use_cache=use_cache, skip_unchanged=skip_unchanged)
+        scraper.scrape_all_sources(concurrency=concurrency, parse_workers=parse_workers,
+                                   poll_all=poll_all, deep_crawl=deep_crawl,
+                                   max_pages=max_pages, max_events=max_events)
         print("✨ Events now available in database!")
     except Exception as e:
         print(f"❌ Fatal error: {e}")
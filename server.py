@@ -15,6 +15,8 @@ from pathlib import Path
 
 from flask import Flask, render_template, jsonify, request, session, redirect
 
+from db_schema import apply_schema
+
 DB_PATH = Path(__file__).parent / "database.db"
 
 app = Flask(__name__)
@@ -34,10 +36,7 @@ def get_db_connection():
 def init_db():
     """Ensure DB and schema exist."""
     conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    with open(Path(__file__).parent / "schema.sql", "r", encoding="utf-8") as f:
-        cur.executescript(f.read())
-    conn.commit()
+    apply_schema(conn)
     conn.close()
 
 
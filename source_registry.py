@@ -0,0 +1,153 @@
+"""
+source_registry.py
+
+Data-driven registry of scrape sources and a yield-aware crawl scheduler.
+
+Sources are declared in sources.json (parser, selectors, timeout, item
+limit and polling interval per source). Each run's outcome is recorded in
+the source_stats table, and the scheduler uses that history to decide
+which sources are due: productive sources are polled at their configured
+interval, while sources that keep failing or yield nothing back off
+exponentially (capped at MAX_POLL_INTERVAL_HOURS).
+
+Usage:
+    sources = load_sources()
+    scheduler = SourceScheduler(conn)
+    for source in scheduler.due_sources(sources):
+        ...
+        scheduler.record(source, found=..., inserted=..., latency=..., failed=...)
+"""
+
+import json
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+SOURCES_FILE = Path(__file__).parent / "sources.json"
+
+MAX_POLL_INTERVAL_HOURS = 7 * 24
+MAX_BACKOFF_EXPONENT = 5
+
+
+class SourceConfig:
+    """Configuration of a single scrape source."""
+
+    def __init__(self, name: str, url: str, parser: str = "generic",
+                 selectors: Optional[Dict] = None, timeout: int = 8,
+                 item_limit: int = 15, poll_interval_hours: float = 6,
+                 group: Optional[str] = None, page_param: Optional[str] = None,
+                 max_pages: int = 10, max_events: int = 200):
+        self.name = name
+        self.url = url
+        self.parser = parser
+        self.selectors = selectors
+        self.timeout = timeout
+        self.item_limit = item_limit
+        self.poll_interval_hours = poll_interval_hours
+        self.group = group
+        # Deep-crawl settings: query parameter used for page numbers when the
+        # page has no "next" link, and the per-source page/event budget
+        self.page_param = page_param
+        self.max_pages = max_pages
+        self.max_events = max_events
+
+    def __repr__(self):
+        return f"SourceConfig({self.name!r}, {self.url!r}, parser={self.parser!r})"
+
+
+def load_sources(path: Path = SOURCES_FILE) -> List[SourceConfig]:
+    """Load the source registry, applying the file-level defaults to each entry."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    defaults = data.get("defaults", {})
+    return [SourceConfig(**{**defaults, **entry}) for entry in data["sources"]]
+
+
+class SourceScheduler:
+    """Decides which sources are due and records per-source crawl statistics."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def stats(self) -> Dict[str, Dict]:
+        """Return the recorded statistics of every source, keyed by name."""
+        cur = self.conn.execute("SELECT * FROM source_stats")
+        columns = [c[0] for c in cur.description]
+        return {row[0]: dict(zip(columns, row)) for row in cur.fetchall()}
+
+    def due_sources(self, sources: List[SourceConfig], poll_all: bool = False) -> List[SourceConfig]:
+        """
+        Return the sources that should be polled now, most productive first.
+
+        Sources never seen before are always due.
+        """
+        stats = self.stats()
+        now = datetime.now().isoformat(timespec="seconds")
+
+        due = []
+        for source in sources:
+            row = stats.get(source.name)
+            if poll_all or not row or not row["next_poll_at"] or row["next_poll_at"] <= now:
+                due.append(source)
+
+        def productivity(source):
+            row = stats.get(source.name)
+            if not row or not row["runs"]:
+                return float("inf")  # unknown sources go first
+            return row["events_inserted"] / row["runs"]
+
+        return sorted(due, key=productivity, reverse=True)
+
+    @staticmethod
+    def next_interval(source: SourceConfig, consecutive_errors: int, consecutive_empty: int) -> float:
+        """Polling interval in hours after a run, backing off on failure or zero yield."""
+        misses = max(consecutive_errors, consecutive_empty)
+        hours = source.poll_interval_hours * (2 ** min(misses, MAX_BACKOFF_EXPONENT))
+        return min(hours, MAX_POLL_INTERVAL_HOURS)
+
+    def record(self, source: SourceConfig, found: int = 0, inserted: int = 0,
+               latency: Optional[float] = None, failed: bool = False):
+        """Record the outcome of polling `source` and schedule its next poll."""
+        row = self.stats().get(source.name) or {}
+        consecutive_errors = row.get("consecutive_errors", 0) + 1 if failed else 0
+        consecutive_empty = 0 if inserted else row.get("consecutive_empty", 0) + (not failed)
+
+        # Exponential moving average of fetch latency
+        avg_latency = row.get("avg_latency")
+        if latency is not None:
+            avg_latency = latency if avg_latency is None else 0.7 * avg_latency + 0.3 * latency
+
+        now = datetime.now()
+        hours = self.next_interval(source, consecutive_errors, consecutive_empty)
+        with self.conn:
+            self.conn.execute(
+                """
+                INSERT INTO source_stats (
+                    source_name, runs, errors, events_found, events_inserted,
+                    consecutive_errors, consecutive_empty, avg_latency,
+                    last_polled_at, next_poll_at
+                )
+                VALUES (?, 1, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(source_name) DO UPDATE SET
+                    runs = runs + 1,
+                    errors = errors + excluded.errors,
+                    events_found = events_found + excluded.events_found,
+                    events_inserted = events_inserted + excluded.events_inserted,
+                    consecutive_errors = excluded.consecutive_errors,
+                    consecutive_empty = excluded.consecutive_empty,
+                    avg_latency = excluded.avg_latency,
+                    last_polled_at = excluded.last_polled_at,
+                    next_poll_at = excluded.next_poll_at
+                """,
+                (
+                    source.name,
+                    int(failed),
+                    found,
+                    inserted,
+                    consecutive_errors,
+                    consecutive_empty,
+                    avg_latency,
+                    now.isoformat(timespec="seconds"),
+                    (now + timedelta(hours=hours)).isoformat(timespec="seconds"),
+                ),
+            )
@@ -0,0 +1,148 @@
+"""
+structured_data.py
+
+Fast-path extraction of schema.org Event objects embedded in listing pages.
+
+Many platforms publish their listings as `application/ld+json` blocks (or
+microdata) with exact ISO dates, venues and canonical URLs. Those blocks
+are found with a regex over the raw HTML, so the full DOM only has to be
+built when a page carries Event microdata.
+
+Usage:
+    events = extract_structured_events(html, source_url, "eventbrite", "EventBrite")
+"""
+
+import json
+import re
+from typing import Dict, Iterator, List, Optional
+
+from bs4 import BeautifulSoup
+
+JSON_LD_BLOCK = re.compile(
+    r"<script[^>]+type=[\"']application/ld\+json[\"'][^>]*>(.*?)</script>",
+    re.IGNORECASE | re.DOTALL,
+)
+MICRODATA_EVENT = re.compile(r"itemtype=[\"']https?://schema\.org/\w*Event[\"']", re.IGNORECASE)
+MICRODATA_EVENT_TYPE = re.compile(r"schema\.org/\w*Event$", re.IGNORECASE)
+
+
+def _is_event_type(value) -> bool:
+    types = value if isinstance(value, list) else [value]
+    return any(isinstance(t, str) and (t == "Event" or t.endswith("Event") or t == "Hackathon")
+               for t in types)
+
+
+def _walk_json_ld(node) -> Iterator[Dict]:
+    """Yield every Event object in a JSON-LD document (@graph, lists, ItemList)."""
+    if isinstance(node, list):
+        for item in node:
+            yield from _walk_json_ld(item)
+    elif isinstance(node, dict):
+        if _is_event_type(node.get("@type")):
+            yield node
+            return
+        for key in ("@graph", "itemListElement", "item", "mainEntity", "subEvent"):
+            if key in node:
+                yield from _walk_json_ld(node[key])
+
+
+def _text(value) -> Optional[str]:
+    if isinstance(value, list):
+        value = value[0] if value else None
+    if isinstance(value, dict):
+        value = value.get("name") or value.get("@id")
+    return str(value).strip() if value else None
+
+
+def _location(value) -> str:
+    if isinstance(value, list):
+        value = value[0] if value else None
+    if isinstance(value, dict):
+        if value.get("@type") == "VirtualLocation":
+            return "Online"
+        address = value.get("address")
+        if isinstance(address, dict):
+            locality = address.get("addressLocality")
+            if value.get("name") and locality:
+                return f"{value['name']}, {locality}"
+            return value.get("name") or locality or "London"
+        return value.get("name") or (address if isinstance(address, str) else None) or "London"
+    return str(value) if value else "London"
+
+
+def _is_free(event: Dict) -> int:
+    if event.get("isAccessibleForFree") in (True, "true", "True"):
+        return 1
+    offers = event.get("offers")
+    for offer in offers if isinstance(offers, list) else [offers]:
+        if isinstance(offer, dict):
+            price = offer.get("price", offer.get("lowPrice"))
+            try:
+                if price is not None and float(price) == 0:
+                    return 1
+            except (TypeError, ValueError):
+                pass
+    return 0
+
+
+def _to_event(raw: Dict, source_url: str, source_key: str, source_name: str) -> Optional[Dict]:
+    title = _text(raw.get("name"))
+    if not title or len(title) < 3:
+        return None
+    date_text = _text(raw.get("startDate"))
+    return {
+        "source_id": f"{source_key}_{title}_{date_text or ''}".replace(" ", "_")[:50],
+        "title": title[:150],
+        "date": date_text,
+        "location": _location(raw.get("location"))[:100],
+        "is_free": _is_free(raw),
+        "source": source_name,
+        "url": _text(raw.get("url")) or source_url,
+        "category": "hackathon" if raw.get("@type") == "Hackathon" else "tech",
+    }
+
+
+def _microdata_events(html: str) -> List[Dict]:
+    """Read Event microdata into JSON-LD-like dicts."""
+    soup = BeautifulSoup(html, "html.parser")
+    found = []
+    for scope in soup.find_all(attrs={"itemtype": MICRODATA_EVENT_TYPE}):
+        props: Dict = {"@type": "Event"}
+        for prop in scope.find_all(attrs={"itemprop": True}):
+            name = prop["itemprop"]
+            if name in props:
+                continue
+            value = prop.get("content") or prop.get("datetime") or prop.get("href")
+            props[name] = value or prop.get_text(strip=True)
+        found.append(props)
+    return found
+
+
+def extract_structured_events(html: str, source_url: str, source_key: str,
+                              source_name: str, limit: int = 15) -> List[Dict]:
+    """
+    Extract events from JSON-LD blocks, falling back to Event microdata.
+
+    Returns an empty list when the page carries no structured Event data,
+    in which case the caller should run the DOM heuristics.
+    """
+    raw_events: List[Dict] = []
+    for block in JSON_LD_BLOCK.findall(html):
+        try:
+            raw_events.extend(_walk_json_ld(json.loads(block.strip())))
+        except ValueError:
+            continue  # malformed block; others may still be usable
+
+    if not raw_events and MICRODATA_EVENT.search(html):
+        raw_events = _microdata_events(html)
+
+    events = []
+    seen = set()
+    for raw in raw_events:
+        event = _to_event(raw, source_url, source_key, source_name)
+        if event and event["source_id"] not in seen:
+            seen.add(event["source_id"])
+            events.append(event)
+            if len(events) >= limit:
+                break
+    return events
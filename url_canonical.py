@@ -0,0 +1,125 @@
+"""
+url_canonical.py
+
+Canonical event URLs used to spot the same event under different links.
+
+Scraped links for one event differ in tracking parameters, http vs https,
+"www.", trailing slashes, letter case of the host, fragments and (for
+Eventbrite) the country domain, the slug and the affiliate suffix. The
+canonical form removes all of that, so a single indexed comparison of
+events.canonical_url finds the duplicates before any URL is checked over
+the network. It is a dedupe key; source_url remains the link that is
+fetched and shown.
+
+Cards without a link of their own are stored under the listing page URL,
+which every card of that page shares. Those events get a listing key
+instead (the page's canonical URL plus the normalized title as fragment),
+so they are not deduplicated against each other; canonical URLs never
+have a fragment, so the two kinds of key cannot collide.
+
+Usage:
+    canonical_url("http://www.eventbrite.co.uk/e/ai-night-tickets-123?aff=ebdssbdestsearch")
+    # -> "https://eventbrite.com/e/123"
+    listing_key("https://www.meetup.com/find/?keywords=tech", "AI  Night")
+    # -> "https://meetup.com/find?keywords=tech#ai night"
+    removed = remove_canonical_duplicates(conn)
+"""
+
+import re
+from typing import List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters that only track where a click came from
+TRACKING_PARAMS = {
+    "aff", "affiliate", "ref", "referrer", "fbclid", "gclid", "dclid", "msclkid",
+    "mc_cid", "mc_eid", "igshid", "_gl", "_ga", "_eboga", "keep_tld",
+}
+TRACKING_PREFIXES = ("utm_", "hsa_")
+
+# Rows whose canonical_url is a listing key, which must not be recomputed from source_url
+LISTING_KEY_CONDITION = "instr(canonical_url, '#') > 0"
+
+EVENTBRITE_HOST = re.compile(r"(?:^|\.)eventbrite\.[a-z.]+$")
+EVENTBRITE_EVENT_ID = re.compile(r"^/e/(?:[^/]*-)?(\d{6,})/?$")
+
+
+def canonical_url(url: Optional[str]) -> Optional[str]:
+    """Return the canonical form of an absolute http(s) URL, or None."""
+    if not url:
+        return None
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return None
+    if parts.scheme.lower() not in ("http", "https") or not parts.hostname:
+        return None
+
+    host = parts.hostname.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+
+    # Eventbrite: the numeric event id identifies the event on every domain
+    if EVENTBRITE_HOST.search(host):
+        match = EVENTBRITE_EVENT_ID.match(parts.path)
+        if match:
+            return f"https://eventbrite.com/e/{match.group(1)}"
+        host = "eventbrite.com"
+
+    path = re.sub(r"/{2,}", "/", parts.path).rstrip("/") or "/"
+    query = urlencode(sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    ))
+    return urlunsplit(("https", host, path, query, ""))
+
+
+def listing_key(page_url: Optional[str], title: Optional[str]) -> Optional[str]:
+    """Dedupe key for an event whose only link is the listing page it was found on."""
+    page = canonical_url(page_url)
+    if not page:
+        return None
+    return f"{page}#{' '.join(str(title or '').lower().split())}"
+
+
+def backfill_canonical_urls(conn) -> int:
+    """Fill canonical_url for rows stored before the column existed."""
+    rows = conn.execute(
+        "SELECT id, source_url FROM events WHERE canonical_url IS NULL AND source_url LIKE 'http%'"
+    ).fetchall()
+    if rows:
+        with conn:
+            conn.executemany(
+                "UPDATE events SET canonical_url = ? WHERE id = ?",
+                [(canonical_url(url), event_id) for event_id, url in rows],
+            )
+    return len(rows)
+
+
+def canonical_duplicate_ids(conn) -> List[int]:
+    """Ids of events whose canonical URL already belongs to an older event."""
+    rows = conn.execute(
+        """
+        SELECT id FROM events
+        WHERE canonical_url IS NOT NULL
+          AND id NOT IN (
+              SELECT MIN(id) FROM events
+              WHERE canonical_url IS NOT NULL
+              GROUP BY canonical_url
+          )
+        ORDER BY id
+        """
+    ).fetchall()
+    return [row[0] for row in rows]
+
+
+def remove_canonical_duplicates(conn) -> int:
+    """Backfill canonical URLs, then delete every event whose canonical URL an older event has."""
+    backfill_canonical_urls(conn)
+    duplicate_ids = canonical_duplicate_ids(conn)
+    if duplicate_ids:
+        with conn:
+            conn.executemany("DELETE FROM events WHERE id = ?", [(event_id,) for event_id in duplicate_ids])
+    return len(duplicate_ids)
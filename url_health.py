@@ -0,0 +1,132 @@
+"""
+url_health.py
+
+Persistent URL health cache shared by the link validation stages.
+
+LinkValidator and EventEnhancer both check the same source_url values,
+and every scheduled run used to check all of them again. Results are now
+kept in the url_checks table: healthy URLs are trusted for HEALTHY_TTL,
+failing URLs are re-checked sooner, with a TTL that doubles on every
+consecutive failure (FAILING_TTL, capped at HEALTHY_TTL), so HTTP volume
+scales with new or stale URLs rather than with the size of the table.
+
+The table is read once when the cache is created; results recorded from
+worker threads are buffered and written in one transaction by flush().
+
+Usage:
+    cache = UrlHealthCache(DB_PATH)
+    hit = cache.get(url)            # (is_valid, final_url) or None
+    cache.record(url, is_valid, final_url)
+    cache.flush()
+"""
+
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from db_schema import apply_schema
+
+HEALTHY_TTL = timedelta(hours=24)
+FAILING_TTL = timedelta(hours=1)
+
+
+class UrlHealthCache:
+    """TTL cache of URL check results backed by the url_checks table."""
+
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict] = {}
+        self._dirty: List[str] = []
+        self.hits = 0
+        self.misses = 0
+        self.load()
+
+    def load(self):
+        """Ensure the schema exists and read all cached checks into memory."""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            apply_schema(conn)
+            rows = conn.execute(
+                "SELECT url, is_valid, final_url, checked_at, failure_count, expires_at FROM url_checks"
+            ).fetchall()
+        finally:
+            conn.close()
+        for url, is_valid, final_url, checked_at, failures, expires_at in rows:
+            self._entries[url] = {
+                "is_valid": bool(is_valid),
+                "final_url": final_url,
+                "checked_at": checked_at,
+                "failure_count": failures,
+                "expires_at": expires_at,
+            }
+
+    def get(self, url: str) -> Optional[Tuple[bool, Optional[str]]]:
+        """Return the cached (is_valid, final_url) for `url` if still fresh."""
+        now = datetime.now().isoformat(timespec="seconds")
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry and entry["expires_at"] > now:
+                self.hits += 1
+                return entry["is_valid"], entry["final_url"]
+            self.misses += 1
+            return None
+
+    def record(self, url: str, is_valid: bool, final_url: Optional[str]):
+        """Store a fresh check result; healthy redirect targets are cached too."""
+        now = datetime.now()
+        with self._lock:
+            previous = self._entries.get(url)
+            if is_valid:
+                failures = 0
+                ttl = HEALTHY_TTL
+            else:
+                failures = (previous["failure_count"] if previous else 0) + 1
+                ttl = min(FAILING_TTL * (2 ** (failures - 1)), HEALTHY_TTL)
+
+            targets = [url]
+            if is_valid and final_url and final_url != url:
+                targets.append(final_url)
+            for target in targets:
+                self._entries[target] = {
+                    "is_valid": is_valid,
+                    "final_url": final_url,
+                    "checked_at": now.isoformat(timespec="seconds"),
+                    "failure_count": failures,
+                    "expires_at": (now + ttl).isoformat(timespec="seconds"),
+                }
+                self._dirty.append(target)
+
+    def flush(self):
+        """Write all results recorded since the last flush in one transaction."""
+        with self._lock:
+            rows = [
+                (
+                    url,
+                    int(self._entries[url]["is_valid"]),
+                    self._entries[url]["final_url"],
+                    self._entries[url]["checked_at"],
+                    self._entries[url]["failure_count"],
+                    self._entries[url]["expires_at"],
+                )
+                for url in dict.fromkeys(self._dirty)
+            ]
+            self._dirty = []
+        if not rows:
+            return
+        conn = sqlite3.connect(self.db_path)
+        try:
+            with conn:
+                conn.executemany(
+                    """
+                    INSERT OR REPLACE INTO url_checks (
+                        url, is_valid, final_url, checked_at, failure_count, expires_at
+                    )
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    """,
+                    rows,
+                )
+        finally:
+            conn.close()